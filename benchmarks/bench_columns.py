@@ -0,0 +1,80 @@
+"""
+Compares PaginatedList.to_columns() with building columns from Resource instances.
+
+Usage: python benchmarks/bench_columns.py [rows] [per_page]
+"""
+import os
+import sys
+import time
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from potion_client import Client
+
+from stub import PageAdapter
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "$uri": {"type": "string", "readOnly": True},
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "score": {"type": "number"},
+        "active": {"type": "boolean"},
+        "created_at": {"type": "object", "properties": {"$date": {"type": "integer"}}},
+        "parent": {"type": "object", "properties": {"$ref": {"type": "string"}}}
+    },
+    "links": [
+        {
+            "rel": "instances",
+            "method": "GET",
+            "href": "/user",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "page": {"type": "integer"},
+                    "per_page": {"type": "integer", "maximum": 1000}
+                }
+            }
+        }
+    ]
+}
+
+
+def make_user(i):
+    return {
+        "$uri": "/user/{}".format(i),
+        "name": "user-{}".format(i),
+        "age": i % 90,
+        "score": i / 7.0,
+        "active": i % 2 == 0,
+        "created_at": {"$date": 1451060269000 + i},
+        "parent": {"$ref": "/user/{}".format(i // 2)}
+    }
+
+
+def naive(users, columns):
+    result = {name: [] for name in columns}
+    for user in users:
+        for name in columns:
+            result[name].append(user.get(name))
+    return result
+
+
+def main(rows=1000000, per_page=1000):
+    columns = [name for name in SCHEMA['properties']]
+
+    for label, fn in (('to_columns', lambda users: users.to_columns(per_page=per_page)),
+                      ('naive loop', lambda users: naive(users, columns))):
+        client = Client('http://example.com', fetch_schema=False)
+        client.session.mount('http://', PageAdapter(rows, make_user))
+        User = client.resource_factory('user', SCHEMA)
+
+        started = time.time()
+        fn(User.instances(per_page=per_page))
+        print('{:<12} {:>10} rows {:>8.2f}s'.format(label, rows, time.time() - started))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
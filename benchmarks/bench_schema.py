@@ -0,0 +1,115 @@
+"""
+Measures resolving the references of a synthetic API schema with 200 resources, compared with resolving them by
+copying the whole schema, as earlier versions of the client did.
+
+Usage: python benchmarks/bench_schema.py [resources] [clients]
+"""
+from __future__ import print_function
+
+from functools import partial
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from potion_client import Client
+from potion_client.converter import JSONSchemaReference, PotionJSONSchemaDecoder
+
+from stub import StubAdapter
+
+
+def resource_schema(i, resources):
+    properties = {"$uri": {"type": "string", "readOnly": True}}
+    for j in range(10):
+        properties["string_{}".format(j)] = {"type": "string"}
+        properties["number_{}".format(j)] = {"type": ["number", "null"], "default": None}
+    properties["created_at"] = {"type": "object", "properties": {"$date": {"type": "integer"}}, "readOnly": True}
+    pattern = "^\\/api\\/resource_{}\\/[^/]+$".format((i + 1) % resources)
+    properties["owner"] = {"type": "object", "properties": {"$ref": {"type": "string", "pattern": pattern}}}
+    properties["related"] = {"$ref": "/api/resource_{}/schema#".format((i + 1) % resources)}
+    properties["alias"] = {"$ref": "#/properties/string_0"}
+
+    route = "/api/resource_{}".format(i)
+    return {
+        "type": "object",
+        "properties": properties,
+        "links": [
+            {"rel": "self", "href": route + "/{id}", "method": "GET", "targetSchema": {"$ref": "#"}},
+            {"rel": "instances", "href": route, "method": "GET", "schema": {
+                "type": "object",
+                "properties": {
+                    "where": {"type": "object"},
+                    "sort": {"type": "object"},
+                    "page": {"type": "integer", "default": 1, "minimum": 1},
+                    "per_page": {"type": "integer", "default": 20, "minimum": 1, "maximum": 100}
+                }
+            }},
+            {"rel": "create", "href": route, "method": "POST", "schema": {"$ref": "#"}},
+            {"rel": "update", "href": route + "/{id}", "method": "PATCH", "schema": {"$ref": "#"}},
+            {"rel": "destroy", "href": route + "/{id}", "method": "DELETE"}
+        ]
+    }
+
+
+def documents(resources=200):
+    return [json.dumps(resource_schema(i, resources)) for i in range(resources)]
+
+
+def routes(resources=200):
+    result = {"/api/schema": {"properties": {"resource_{}".format(i): {"$ref": "/api/resource_{}/schema#".format(i)}
+                                             for i in range(resources)}}}
+    for i in range(resources):
+        result["/api/resource_{}/schema".format(i)] = resource_schema(i, resources)
+    return result
+
+
+def copy_resolve_refs(schema, ref_resolver, root=None):
+    if isinstance(schema, dict):
+        if len(schema) == 1 and "$ref" in schema and isinstance(schema["$ref"], str):
+            if schema["$ref"].startswith("#"):
+                return root
+            return ref_resolver(schema["$ref"])
+        resolved = {}
+        for k, v in schema.items():
+            resolved[k] = copy_resolve_refs(v, ref_resolver, root if root is not None else resolved)
+        return resolved
+    if isinstance(schema, list):
+        return [copy_resolve_refs(v, ref_resolver, root) for v in schema]
+    return schema
+
+
+def measure(label, resolve, docs, clients):
+    results = []
+    tracemalloc.start()
+    started = time.time()
+    for _ in range(clients):
+        client = Client('http://example.com/api', fetch_schema=False)
+        results.append([resolve(client, json.loads(doc)) for doc in docs])
+    elapsed = time.time() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print('{:<12} {:>4} clients {:>8.3f}s {:>10.1f} MiB'.format(label, clients, elapsed, memory / 2.0 ** 20))
+
+
+def main(resources=200, clients=10):
+    docs = documents(resources)
+    print('{} resources, {:.1f} KiB of schema documents'.format(resources, sum(len(doc) for doc in docs) / 1024.0))
+
+    measure('copying', lambda client, o: copy_resolve_refs(o, partial(client.instance,
+                                                                      cls=JSONSchemaReference,
+                                                                      client=client)), docs, clients)
+    measure('resolver', lambda client, o: PotionJSONSchemaDecoder(client).convert(o), docs, clients)
+
+    started = time.time()
+    client = Client('http://example.com/api', fetch_schema=False)
+    client.session.mount('http://', StubAdapter(routes(resources)))
+    client._fetch_schema()
+    print('{:<12} {:>8.3f}s'.format('Client()', time.time() - started))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
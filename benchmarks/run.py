@@ -0,0 +1,248 @@
+"""
+Microbenchmarks for the hot paths of the client. No network is used.
+
+Usage::
+
+    python benchmarks/run.py                                  # print results
+    python benchmarks/run.py --output results.json            # store results
+    python benchmarks/run.py --compare baseline.json          # fail if slower than the baseline
+
+Each benchmark is repeated and the median time of one run is reported. A benchmark is a regression if its median
+is more than ``--threshold`` (relative) slower than in the baseline.
+"""
+from __future__ import print_function
+
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+# run from a checkout without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from potion_client import Client
+from potion_client.converter import PotionJSONSchemaDecoder, timezone
+
+from bench_schema import documents as schema_documents
+from stub import PageAdapter
+
+BENCHMARKS = []
+
+
+def benchmark(number=1):
+    def decorator(fn):
+        BENCHMARKS.append((fn.__name__, fn, number))
+        return fn
+    return decorator
+
+
+def make_user(i):
+    return {
+        "$uri": "/user/{}".format(i),
+        "name": "user-{}".format(i),
+        "age": i % 90,
+        "created_at": {"$date": 1451060269000 + i},
+        "parent": {"$ref": "/user/{}".format(i // 2)},
+        "tags": ["a", "b", "c"]
+    }
+
+
+def user_schema(properties=10, links=5):
+    schema = {
+        "type": "object",
+        "properties": {"$uri": {"type": "string", "readOnly": True}},
+        "links": [
+            {
+                "rel": "self",
+                "href": "/user/{id}",
+                "method": "GET"
+            },
+            {
+                "rel": "instances",
+                "href": "/user",
+                "method": "GET",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "page": {"type": "integer"},
+                        "per_page": {"type": "integer"},
+                        "where": {"type": "object"},
+                        "sort": {"type": "object"}
+                    }
+                }
+            },
+            {
+                "rel": "create",
+                "href": "/user",
+                "method": "POST",
+                "schema": {"$ref": "#"}
+            }
+        ]
+    }
+
+    for i in range(properties):
+        schema["properties"]["property_{}".format(i)] = {"type": "string", "description": "Property {}".format(i)}
+    schema["properties"].update({"name": {"type": "string"}, "age": {"type": "integer"}})
+
+    for i in range(links):
+        schema["links"].append({
+            "rel": "route{}".format(i),
+            "href": "/user/{{id}}/route-{}".format(i),
+            "method": "POST",
+            "schema": {"type": "object", "properties": {"value": {"type": "integer"}}}
+        })
+    return schema
+
+
+def make_client(rows=0):
+    client = Client('http://example.com', fetch_schema=False)
+    client.session.mount('http://', PageAdapter(rows, make_user))
+    client.resource_factory('user', user_schema())
+    return client
+
+
+@benchmark()
+def decode_large_list():
+    client = make_client()
+    data = json.dumps([make_user(i) for i in range(10000)])
+    return lambda: client._decode(data)
+
+
+@benchmark()
+def decode_deeply_nested():
+    client = make_client()
+    value = {"$date": 1451060269000}
+    for i in range(200):
+        value = {"level": i, "children": [value, {"$ref": "/user/{}".format(i)}]}
+    data = json.dumps([value] * 20)
+    return lambda: client._decode(data)
+
+
+@benchmark()
+def encode_bulk_write():
+    client = make_client()
+    User = client._resource_classes['user']
+    owners = [User(i) for i in range(100)]
+    items = [{"name": "user-{}".format(i),
+              "created_at": datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc),
+              "owner": owners[i % 100],
+              "tags": ["a", "b", "c"]} for i in range(10000)]
+    return lambda: client._encode(items)
+
+
+@benchmark(number=1000)
+def request_factory_get():
+    User = make_client()._resource_classes['user']
+    binding = User.instances
+    params = {"where": {"name": {"$startswith": "foo"}, "age": {"$gt": 18}}, "sort": {"name": False},
+              "page": 1, "per_page": 20}
+    return lambda: binding.request_factory(None, params)
+
+
+@benchmark(number=1000)
+def request_factory_post():
+    User = make_client()._resource_classes['user']
+    binding = User.create
+    data = {"name": "foo", "age": 30, "created_at": datetime(2015, 12, 25, tzinfo=timezone.utc)}
+    return lambda: binding.request_factory(data, {})
+
+
+@benchmark()
+def identity_map_lookups():
+    client = make_client()
+    User = client._resource_classes['user']
+    users = [User(i) for i in range(1000)]
+    uris = [user._uri for user in users] * 100
+    return lambda: [client.instance(uri) for uri in uris]
+
+
+@benchmark()
+def resource_factory_large_schema():
+    client = make_client()
+    schema = user_schema(properties=200, links=50)
+    return lambda: client.resource_factory('user', schema)
+
+
+@benchmark()
+def resolve_schema_200_resources():
+    schemas = [json.loads(document) for document in schema_documents(200)]
+
+    def resolve():
+        decoder = PotionJSONSchemaDecoder(Client('http://example.com/api', fetch_schema=False))
+        return [decoder.convert(schema) for schema in schemas]
+    return resolve
+
+
+@benchmark()
+def paginated_list_iteration():
+    client = make_client(rows=10000)
+    User = client._resource_classes['user']
+    return lambda: list(User.instances(per_page=100))
+
+
+def run(names=None, repeat=5):
+    results = {}
+    for name, setup, number in BENCHMARKS:
+        if names and name not in names:
+            continue
+        fn = setup()
+        times = sorted(timeit.repeat(fn, number=number, repeat=repeat))
+        results[name] = {
+            "median": times[len(times) // 2] / number,
+            "min": times[0] / number,
+            "number": number,
+            "repeat": repeat
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    :return: a list of ``(name, baseline median, median)`` tuples for the benchmarks that regressed
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name in baseline and result["median"] > baseline[name]["median"] * (1 + threshold):
+            regressions.append((name, baseline[name]["median"], result["median"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('names', nargs='*', help='benchmarks to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with the results in this file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown counted as a regression')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.repeat)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    for name, result in sorted(results.items()):
+        line = '{:<32} {:>12.6f}s'.format(name, result["median"])
+        if baseline and name in baseline:
+            line += ' {:>+8.1%}'.format(result["median"] / baseline[name]["median"] - 1)
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"python": platform.python_version(), "benchmarks": results}, f, indent=2, sort_keys=True)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, before, after in regressions:
+            print('REGRESSION {}: {:.6f}s -> {:.6f}s'.format(name, before, after), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
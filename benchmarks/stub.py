@@ -0,0 +1,55 @@
+"""
+Transport adapters for running benchmarks without a network.
+"""
+import json
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from six.moves.urllib.parse import urlparse, parse_qs
+
+
+def make_response(request, content, status_code=200, headers=None):
+    response = Response()
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'application/json'
+    response.headers.update(headers or {})
+    response._content = content
+    response.request = request
+    response.url = request.url
+    return response
+
+
+class StubAdapter(BaseAdapter):
+    """Serves fixed responses by path."""
+
+    def __init__(self, routes=None):
+        super(StubAdapter, self).__init__()
+        self.routes = {path: json.dumps(body).encode('utf-8') for path, body in (routes or {}).items()}
+
+    def send(self, request, **kwargs):
+        path = urlparse(request.url).path
+        if path not in self.routes:
+            return make_response(request, b'{"status": 404}', 404)
+        return make_response(request, self.routes[path])
+
+    def close(self):
+        pass
+
+
+class PageAdapter(BaseAdapter):
+    """Serves pages of synthetic items generated by ``factory(index)``, with an ``X-Total-Count`` header."""
+
+    def __init__(self, rows, factory):
+        super(PageAdapter, self).__init__()
+        self.rows = rows
+        self.factory = factory
+
+    def send(self, request, **kwargs):
+        params = parse_qs(urlparse(request.url).query)
+        page, per_page = int(params['page'][0]), int(params['per_page'][0])
+        start, end = (page - 1) * per_page, min(self.rows, page * per_page)
+        content = json.dumps([self.factory(i) for i in range(start, end)]).encode('utf-8')
+        return make_response(request, content, headers={'X-Total-Count': str(self.rows)})
+
+    def close(self):
+        pass
@@ -1,78 +1,394 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from contextlib import contextmanager
 from functools import partial
+from importlib import import_module
 from operator import getitem, delitem, setitem
+from threading import RLock, local
 from six.moves.urllib.parse import urlparse, urljoin
 from weakref import WeakValueDictionary
+from collections import deque
 import collections
 import requests
+import six
+import time
 
-from potion_client.converter import PotionJSONDecoder, PotionJSONSchemaDecoder
-from potion_client.resource import Reference, Resource, uri_for
+from potion_client.backends import get_backend
+from potion_client.compression import get_compression
+from potion_client.converter import PotionJSONDecoder, PotionJSONEncoder, PotionJSONSchemaDecoder, JSONSchemaReference
+from potion_client.exceptions import DeadlineExceeded
+from potion_client.resource import Reference, Resource, ResourceProperty, uri_for
 from potion_client.links import Link
 from potion_client.utils import upper_camel_case, snake_case
 
 
 class Client(object):
+    """
+    A client for a Flask-Potion API.
+
+    A single client may be shared between threads. The identity map is guarded by a lock, each reference is resolved
+    by at most one thread at a time and pages of a :class:`PaginatedList` are fetched only once. All threads share the
+    connection pool of :attr:`session`; the session itself should not be reconfigured while it is in use.
+    Changes to the properties of the same instance from several threads are not synchronized.
+
+    Clients and resource instances can be pickled. A client is rebuilt from its root URL and the schema documents it
+    has already loaded, so unpickling one does not fetch the schema again.
+
+    Instead of fetching the schema, a client can be bound to a module generated with
+    :func:`potion_client.codegen.generate_module` by passing the module, or its name, as ``schema_module``.
+
+    Instances of resources that set ``_cache`` are resolved through ``cache``, a :class:`SharedCache` that the
+    clients of several processes can share, if one is given.
+    """
     # TODO optional HTTP/2 support: this makes multiple queries simultaneously.
 
-    def __init__(self, api_root_url, schema_path='/schema', fetch_schema=True, **session_kwargs):
+    def __init__(self,
+                 api_root_url,
+                 schema_path='/schema',
+                 fetch_schema=True,
+                 json_backend=None,
+                 compression=None,
+                 hedging=None,
+                 admission=None,
+                 lazy_decoding=False,
+                 schema_module=None,
+                 validation=False,
+                 cache=None,
+                 **session_kwargs):
         self._instances = WeakValueDictionary()
         self._resources = {}
+        self._resource_classes = {}
+        self._schema_documents = {}
+        self._schema_interned = {}
+        self._lock = RLock()
+        self._local = local()
+        self._json = get_backend(json_backend)
+        self._encoder = PotionJSONEncoder()
+        self.compression = get_compression(compression)
+        self.hedging = hedging
+        self.admission = admission
+        self.lazy_decoding = lazy_decoding
+        self.validation = validation
+        self.cache = cache
 
         self.session = session = requests.Session()
         for key, value in session_kwargs.items():
             setattr(session, key, value)
+        self._session_kwargs = session_kwargs
 
         parse_result = urlparse(api_root_url)
         self._root_url = '{}://{}'.format(parse_result.scheme, parse_result.netloc)
         self._api_root_url = api_root_url  # '{}://{}'.format(parse_result.scheme, parse_result.netloc)
         self._root_path = parse_result.path
+        self._schema_path = schema_path
         self._schema_url = api_root_url + schema_path
+        self._schema_fetched = False
+        self._schema_module = None
+
+        if schema_module is not None:
+            self._bind_module(schema_module)
+        elif fetch_schema:
+            self._fetch_schema()
+
+    def __getstate__(self):
+        # Resources defined from the fetched schema are rebuilt from the schema documents; only resources that have
+        # been defined through resource_factory() with a schema of their own need to be stored.
+        resource_definitions = [(name, cls._schema, cls.__bases__[0])
+                                for name, cls in self._resource_classes.items()
+                                if not isinstance(cls._schema, Reference)]
+
+        return {
+            'api_root_url': self._api_root_url,
+            'schema_path': self._schema_path,
+            'schema_fetched': self._schema_fetched,
+            'schema_documents': self._schema_documents,
+            'resource_definitions': resource_definitions,
+            'json_backend': self._json,
+            'compression': self.compression,
+            'hedging': self.hedging,
+            'admission': self.admission,
+            'lazy_decoding': self.lazy_decoding,
+            'validation': self.validation,
+            'cache': self.cache,
+            'cached_resources': [name for name, cls in self._resource_classes.items() if cls._cache],
+            'schema_module': self._schema_module.__name__ if self._schema_module is not None else None,
+            'session_kwargs': self._session_kwargs
+        }
 
-        if fetch_schema:
+    def __setstate__(self, state):
+        self.__init__(state['api_root_url'],
+                      schema_path=state['schema_path'],
+                      fetch_schema=False,
+                      json_backend=state['json_backend'],
+                      compression=state['compression'],
+                      hedging=state['hedging'],
+                      admission=state['admission'],
+                      lazy_decoding=state['lazy_decoding'],
+                      schema_module=state['schema_module'],
+                      validation=state['validation'],
+                      cache=state['cache'],
+                      **state['session_kwargs'])
+
+        self._schema_documents.update(state['schema_documents'])
+        if state['schema_fetched']:
             self._fetch_schema()
 
+        for name, schema, resource_cls in state['resource_definitions']:
+            self.resource_factory(name, schema, resource_cls=resource_cls)
+
+        for name in state['cached_resources']:
+            self._resource_classes[name]._cache = True
+
     def _fetch_schema(self):
-        schema = self.session \
-            .get(self._schema_url) \
-            .json(cls=PotionJSONSchemaDecoder,
-                  referrer=self._schema_url,
-                  client=self)
+        schema = self.fetch(self._schema_url, cls=PotionJSONSchemaDecoder)
 
         # NOTE these should perhaps be definitions in Flask-Potion
         for name, resource_schema in schema['properties'].items():
             resource = self.resource_factory(name, resource_schema)
             setattr(self, upper_camel_case(name), resource)
 
+        self._schema_fetched = True
+
+    def _bind_module(self, module):
+        # NOTE the generated classes are bound through resource_factory(), which still decodes the stored schema
+        # documents and builds the links of each resource; only the request for the schema is saved.
+        if isinstance(module, six.string_types):
+            module = import_module(module)
+
+        self._schema_module = module
+        self._schema_documents.update(module.SCHEMA_DOCUMENTS)
+
+        for resource_cls in module.RESOURCES:
+            schema = self.instance(resource_cls._schema_uri, cls=JSONSchemaReference, client=self)
+            resource = self.resource_factory(resource_cls._name, schema, resource_cls=resource_cls)
+            for rel, admission in resource_cls._admission.items():
+                resource._links[rel].schema._admission.update(admission)
+            setattr(self, resource_cls.__name__, resource)
+
     def instance(self, uri, cls=None, default=None, **kwargs):
         instance = self._instances.get(uri, None)
+        if instance is not None:
+            return instance
 
-        if instance is None:
-            if cls is None:
-                try:
-                    cls = self._resources[uri[:uri.rfind('/')]]
-                except KeyError:
-                    cls = Reference
-
-            if isinstance(default, Resource) and default._uri is None:
-                default._status = 200
-                default._uri = uri
-                instance = default
-            else:
-                instance = cls(uri=uri, **kwargs)
-            self._instances[uri] = instance
-        return instance
+        with self._lock:
+            instance = self._instances.get(uri, None)
+
+            if instance is None:
+                if cls is None:
+                    try:
+                        cls = self._resources[uri[:uri.rfind('/')]]
+                    except KeyError:
+                        cls = Reference
+
+                if isinstance(default, Resource) and default._uri is None:
+                    default._status = 200
+                    default._uri = uri
+                    instance = default
+                else:
+                    instance = cls(uri=uri, **kwargs)
+                self._instances[uri] = instance
+            return instance
 
     def fetch(self, uri, cls=PotionJSONDecoder, **kwargs):
         # TODO handle URL fragments (#properties/id etc.)
-        response = self.session \
-            .get(urljoin(self._root_url, uri, True))
+        if cls is PotionJSONSchemaDecoder and uri in self._schema_documents:
+            return self._decode(self._schema_documents[uri], cls=cls, referrer=uri, **kwargs)
 
+        cache = self._cache_for(uri) if cls is not PotionJSONSchemaDecoder else None
+        if cache is not None:
+            content = cache.get(uri)
+            if content is not None:
+                return self._decode(content, cls=cls, referrer=uri, **kwargs)
+
+        response = self._send(requests.Request('GET', urljoin(self._root_url, uri, True)))
         response.raise_for_status()
 
-        return response.json(cls=cls,
-                             client=self,
-                             referrer=uri,
-                             **kwargs)
+        if cls is PotionJSONSchemaDecoder:
+            self._schema_documents[uri] = response.content
+        elif cache is not None:
+            cache.set(uri, response.content)
+
+        return self._decode(response.content, cls=cls, referrer=uri, **kwargs)
+
+    def _cache_for(self, uri):
+        # the cache is used only for instances of resources that opt in
+        if self.cache is None:
+            return None
+        resource = self._resources.get(uri[:uri.rfind('/')])
+        if resource is None or not resource._cache:
+            return None
+        return self.cache
+
+    def _invalidate(self, uri):
+        cache = self._cache_for(uri)
+        if cache is not None:
+            cache.delete(uri)
+
+    @contextmanager
+    def deadline(self, seconds):
+        """
+        Bounds the time spent on all requests made by the current thread within the context, including requests made
+        for it by :meth:`fetch_many` and :meth:`LinkBinding.map`. Each request is sent with the remaining time as its
+        timeout, and :class:`DeadlineExceeded` is raised instead of sending a request once no time is left::
+
+            with client.deadline(2):
+                user = User.first(where={"name": "foo"})
+
+        Nested deadlines cannot extend the deadline they are in. Note that the timeout of a request limits the time
+        spent waiting for each response from the server, not the time spent reading the response.
+
+        :param float seconds: the time budget
+        """
+        expires = time.time() + seconds
+        current = getattr(self._local, 'deadline', None)
+        if current is not None:
+            expires = min(expires, current)
+
+        with self._deadline_at(expires):
+            yield
+
+    @contextmanager
+    def _deadline_at(self, expires):
+        previous = getattr(self._local, 'deadline', None)
+        self._local.deadline = expires
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def _send_before(self, expires, request, **kwargs):
+        remaining = expires - time.time()
+        if remaining <= 0:
+            raise DeadlineExceeded('Deadline exceeded before sending {} {}'.format(request.method, request.url))
+
+        timeout = kwargs.get('timeout')
+        if timeout is None:
+            timeout = remaining
+        elif isinstance(timeout, tuple):
+            timeout = tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        else:
+            timeout = min(timeout, remaining)
+        kwargs['timeout'] = timeout
+
+        try:
+            return self.session.send(request, **kwargs)
+        except requests.Timeout as e:
+            if time.time() < expires:
+                raise
+            six.raise_from(DeadlineExceeded('Deadline exceeded while waiting for {} {}'.format(request.method,
+                                                                                               request.url)), e)
+
+    def _send(self, request, link=None, **kwargs):
+        """
+        Prepares and sends a request using the session of this client. Requests pass through the
+        :class:`AdmissionControl` of the client and the link, if any; throttled requests are retried according to
+        the controller of the link, or else of the client. Idempotent requests are hedged if a :class:`HedgingPolicy`
+        is set on the link or the client, unless the response is streamed. Within :meth:`deadline`, every attempt is
+        sent with the remaining time as its timeout.
+
+        :param requests.Request request:
+        :param Link link: the link the request is made for, if any
+        :param kwargs: keyword arguments for :meth:`requests.Session.send`, such as ``stream``
+        """
+        prepared_request = self.session.prepare_request(request)
+
+        send = self.session.send
+        expires = getattr(self._local, 'deadline', None)
+        if expires is not None:
+            send = partial(self._send_before, expires)
+
+        # NOTE throttled requests are retried only by the outermost controller, the one of the link if it has one;
+        # retrying at every level would multiply the attempts.
+        admissions = [admission for admission in (self.admission, link.admission if link is not None else None)
+                      if admission]
+        for admission in admissions[:-1]:
+            send = partial(admission.admit, send, expires=expires)
+        if admissions:
+            send = partial(admissions[-1].send, send, expires=expires)
+
+        hedging = self.hedging
+        if link is not None and link.hedging is not None:
+            hedging = link.hedging
+
+        # NOTE a streamed response is read after it is returned, so its latency cannot be measured or raced.
+        if hedging and prepared_request.method == 'GET' and not kwargs.get('stream'):
+            return hedging.send(send, prepared_request, **kwargs)
+        return send(prepared_request, **kwargs)
+
+    def _decode(self, content, cls=PotionJSONDecoder, **kwargs):
+        return cls(client=self, **kwargs).convert(self._json.loads(content))
+
+    def _encode(self, o):
+        return self._json.dumps(self._encoder.convert(o))
+
+    def fetch_many(self, uris, concurrency=8):
+        """
+        Resolves a list of instances concurrently. Instances are looked up in the identity map first and only
+        instances that have not been resolved yet are fetched.
+
+        :param list uris: a list of instance URIs
+        :param int concurrency: the maximum number of requests in flight
+        :return: a list with the instance for each URI, in order, or the exception raised while fetching it
+        """
+        return self._resolve_many([self.instance(uri) for uri in uris], concurrency)
+
+    def _resolve_many(self, instances, concurrency=8):
+        # NOTE instances are compared by identity; comparing them as mappings would resolve them.
+        pending = {}
+        for instance in instances:
+            if instance._status is None:
+                pending.setdefault(id(instance), instance)
+
+        def resolve(instance):
+            instance._properties
+            return instance
+
+        results = dict(zip(pending.keys(), self._map(resolve, pending.values(), concurrency)))
+        return [results.get(id(instance), instance) for instance in instances]
+
+    def _map(self, fn, items, concurrency=8, ordered=True):
+        """
+        Calls ``fn`` for each item using a pool of threads. Exceptions are returned in place of the result of the
+        item that raised them.
+
+        :param bool ordered: whether to return the results in the order of the items or as soon as they are ready
+        :return: an iterator over the results
+        """
+        # NOTE the deadline is read when _map() is called, not when the results are first iterated over.
+        expires = getattr(self._local, 'deadline', None)
+
+        def call(item):
+            try:
+                with self._deadline_at(expires):
+                    return fn(item)
+            except Exception as e:
+                return e
+
+        return self._iter_map(call, items, concurrency, ordered)
+
+    def _iter_map(self, call, items, concurrency, ordered):
+        # keep at most two items per thread in the queue so that items are consumed lazily
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if ordered:
+                queue = deque()
+                for item in items:
+                    queue.append(executor.submit(call, item))
+                    if len(queue) >= 2 * concurrency:
+                        yield queue.popleft().result()
+
+                while queue:
+                    yield queue.popleft().result()
+                return
+
+            pending = set()
+            for item in items:
+                pending.add(executor.submit(call, item))
+                if len(pending) >= 2 * concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            for future in as_completed(pending):
+                yield future.result()
 
     def resource_factory(self, name, schema, resource_cls=None):
         """
@@ -91,6 +407,7 @@ class Client(object):
 
         cls._schema = schema
         cls._client = self
+        cls._name = name
         cls._links = links = {}
 
         for link_schema in schema['links']:
@@ -117,6 +434,10 @@ class Client(object):
             if property_name.startswith('$'):
                 continue
 
+            # generated resource classes already define their properties
+            if isinstance(getattr(cls, property_name, None), ResourceProperty):
+                continue
+
             if property_schema.get('readOnly', False):
                 # TODO better error message. Raises AttributeError("can't set attribute")
                 setattr(cls,
@@ -140,6 +461,7 @@ class Client(object):
             root = self._root_path + '/' + name.replace('_', '-')
 
         self._resources[root] = cls
+        self._resource_classes[name] = cls
         return cls
 
 
@@ -1,11 +1,133 @@
+from threading import Condition, Thread
+import time
+
 from requests.auth import AuthBase
 
 
 class HTTPBearerAuth(AuthBase):
-    """Attaches HTTP Basic Authentication to the given Request object."""
-    def __init__(self, token):
+    """
+    Attaches HTTP Bearer Authentication to the given Request object.
+
+    The token can be fixed or come from a token provider. A provider is a callable that returns a new token, or a
+    ``(token, expires_in)`` tuple where ``expires_in`` is the number of seconds the token is valid for. Tokens are
+    refreshed in a background thread ``refresh_ahead`` seconds before they expire, so requests do not wait for a
+    refresh. Threads that need a token while one is being fetched share that refresh. A request that is answered with
+    ``401 Unauthorized`` is sent once more with a new token, if a different token can be fetched.
+
+    The second attempt is sent directly through the connection adapter of the first, so it does not pass through the
+    :class:`AdmissionControl` of a client and is not bounded by :meth:`Client.deadline` beyond the timeout of the
+    first attempt.
+
+    :param str token: a fixed token, or the initial token if there is a provider
+    :param callable provider: a token provider, or None
+    :param float refresh_ahead: the number of seconds before a token expires at which a new one is fetched
+    """
+
+    def __init__(self, token=None, provider=None, refresh_ahead=60):
         self.token = token
+        self.provider = provider
+        self.refresh_ahead = refresh_ahead
+        self.expires_at = None
+        self._refreshing = False
+        self._condition = Condition()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_condition']
+        state['_refreshing'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition = Condition()
+
+    def refresh(self, stale=None):
+        """
+        Fetches a new token from the provider. If a refresh is already in progress, waits for it instead.
+
+        :param str stale: a token that has been rejected; if the current token is a different one, it is returned
+            without fetching another
+        :return: the new token
+        """
+        with self._condition:
+            if self._refreshing:
+                while self._refreshing:
+                    self._condition.wait()
+                return self.token
+
+            if stale is not None and self.token != stale:
+                return self.token
+            self._refreshing = True
+
+        token, expires_at = None, None
+        try:
+            result = self.provider()
+            if isinstance(result, tuple):
+                token, expires_in = result
+                if expires_in is not None:
+                    expires_at = time.time() + expires_in
+            else:
+                token = result
+        finally:
+            with self._condition:
+                if token is not None:
+                    self.token, self.expires_at = token, expires_at
+                self._refreshing = False
+                self._condition.notify_all()
+        return token
+
+    def _refresh_in_background(self, stale):
+        def refresh():
+            try:
+                self.refresh(stale)
+            except Exception:
+                pass  # the token is fetched again when it is needed
+
+        thread = Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def get_token(self):
+        """
+        :return: a token that has not expired, fetching one from the provider first if needed
+        """
+        token, expires_at = self.token, self.expires_at
+        if self.provider is None:
+            return token
+
+        if token is None or (expires_at is not None and time.time() >= expires_at):
+            return self.refresh(token)
+
+        if expires_at is not None and time.time() >= expires_at - self.refresh_ahead and not self._refreshing:
+            self._refresh_in_background(token)
+        return token
+
+    def handle_401(self, response, **kwargs):
+        if response.status_code != 401 or getattr(response.request, '_bearer_retried', False):
+            return response
+
+        rejected = response.request.headers.get('Authorization', '')[len('Bearer '):]
+        token = self.refresh(rejected or None)
+
+        # the provider failed, possibly in another thread, or did not issue a new token
+        if token is None or token == rejected:
+            return response
+
+        # Consume the content so the connection can be released.
+        response.content
+        response.close()
+
+        request = response.request.copy()
+        request.headers['Authorization'] = 'Bearer {}'.format(token)
+        request._bearer_retried = True
+
+        retried = response.connection.send(request, **kwargs)
+        retried.history.append(response)
+        retried.request = request
+        return retried
 
     def __call__(self, r):
-        r.headers['Authorization'] = 'Bearer {}'.format(self.token)
+        r.headers['Authorization'] = 'Bearer {}'.format(self.get_token())
+        if self.provider is not None:
+            r.register_hook('response', self.handle_401)
         return r
@@ -0,0 +1,102 @@
+import json
+
+import six
+
+
+class JSONBackend(object):
+    """
+    Parses and serializes JSON using the :mod:`json` module from the standard library.
+
+    A backend only needs to convert between JSON and plain Python objects; the Potion-specific conversions for
+    ``{"$date"}``, ``{"$ref"}`` and ``{"$uri"}`` objects are applied by :class:`PotionJSONEncoder` and
+    :class:`PotionJSONDecoder` on top of it.
+    """
+    name = 'json'
+
+    def loads(self, s):
+        if isinstance(s, six.binary_type):
+            s = s.decode('utf-8')
+        return json.loads(s)
+
+    def dumps(self, o):
+        return json.dumps(o)
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+    def __repr__(self):
+        return '{}()'.format(self.__class__.__name__)
+
+
+class SimpleJSONBackend(JSONBackend):
+    name = 'simplejson'
+
+    def __init__(self):
+        import simplejson
+        self._simplejson = simplejson
+
+    def loads(self, s):
+        if isinstance(s, six.binary_type):
+            s = s.decode('utf-8')
+        return self._simplejson.loads(s)
+
+    def dumps(self, o):
+        return self._simplejson.dumps(o)
+
+
+class UJSONBackend(JSONBackend):
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def loads(self, s):
+        return self._ujson.loads(s)
+
+    def dumps(self, o):
+        return self._ujson.dumps(o, escape_forward_slashes=False)
+
+
+class OrjsonBackend(JSONBackend):
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def loads(self, s):
+        return self._orjson.loads(s)
+
+    def dumps(self, o):
+        return self._orjson.dumps(o, option=self._orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+BACKENDS = {backend.name: backend for backend in (JSONBackend, SimpleJSONBackend, UJSONBackend, OrjsonBackend)}
+
+
+def get_backend(backend=None):
+    """
+    Returns a JSON backend.
+
+    :param backend: None for the standard library backend, the name of a backend, ``'auto'`` for the fastest
+        backend that is installed, or a backend instance
+    """
+    if backend is None:
+        return JSONBackend()
+
+    if backend == 'auto':
+        for name in ('orjson', 'ujson', 'simplejson'):
+            try:
+                return BACKENDS[name]()
+            except ImportError:
+                pass
+        return JSONBackend()
+
+    if isinstance(backend, six.string_types):
+        try:
+            return BACKENDS[backend]()
+        except KeyError:
+            raise ValueError("Unknown JSON backend: '{}'".format(backend))
+
+    return backend
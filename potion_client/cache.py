@@ -0,0 +1,171 @@
+"""
+A second-level cache of Potion items that several processes on a host can share.
+
+Items are stored as the raw JSON returned by the server, keyed by their ``$uri``, in an SQLite database in WAL mode,
+so that readers in one process do not block writers in another. Each entry expires after a fixed time, and the
+entries closest to expiring are evicted once the total size of the cache exceeds its limit.
+"""
+from threading import local
+import os
+import sqlite3
+import time
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS entries (uri TEXT PRIMARY KEY, content BLOB NOT NULL, expires REAL NOT NULL, '
+    'size INTEGER NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)',
+    'CREATE TABLE IF NOT EXISTS total (size INTEGER NOT NULL)',
+    'INSERT INTO total (size) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM total)',
+    'CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries '
+    'BEGIN UPDATE total SET size = size + new.size; END',
+    'CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries '
+    'BEGIN UPDATE total SET size = size - old.size; END',
+)
+
+
+class SharedCache(object):
+    """
+    A cache of the raw JSON of resource items in an SQLite database file. Every process and thread opens its own
+    connection to the file, so the cache can be shared by the workers of a server or a task queue::
+
+        cache = SharedCache('/var/tmp/potion-cache.db', ttl=60)
+        client = Client('http://localhost/api', cache=cache)
+        client.User._cache = True
+
+    Only resources that opt in, by setting ``_cache`` on the resource class, are cached. Instances are stored when
+    they are resolved through :meth:`Client.fetch`, and removed when they are saved or deleted through this client.
+    Other writers are not seen until the entry expires.
+
+    Errors reading or writing an entry, for instance while the database is locked for longer than ``timeout``, are
+    treated as a cache miss rather than raised, except when removing an entry.
+
+    :param str path: the path of the database file; it is created if it does not exist
+    :param float ttl: the time in seconds after which an entry expires
+    :param int max_size: the maximum total size in bytes of the entries, or None
+    :param float timeout: the time in seconds to wait for a lock on the database
+    """
+
+    def __init__(self, path, ttl=300, max_size=64 * 1024 * 1024, timeout=5.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.timeout = timeout
+        self._local = local()
+
+        with self._transaction() as connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = local()
+
+    def _connection(self):
+        # NOTE connections cannot be shared with a forked process; the child opens its own.
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def get(self, uri):
+        """
+        :param str uri: the ``$uri`` of an item
+        :return: the JSON of the item as bytes, or None if it is not cached or has expired
+        """
+        try:
+            row = self._connection().execute('SELECT content FROM entries WHERE uri = ? AND expires > ?',
+                                             (uri, time.time())).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        return bytes(row[0])
+
+    def set(self, uri, content):
+        """
+        Stores the JSON of an item, then evicts expired entries and, if the cache is too large, the entries closest
+        to expiring.
+
+        :param str uri: the ``$uri`` of the item
+        :param bytes content: the JSON of the item
+        """
+        if self.max_size is not None and len(content) > self.max_size:
+            return
+
+        now = time.time()
+        try:
+            with self._transaction() as connection:
+                connection.execute('DELETE FROM entries WHERE uri = ?', (uri,))
+                connection.execute('INSERT INTO entries (uri, content, expires, size) VALUES (?, ?, ?, ?)',
+                                   (uri, sqlite3.Binary(content), now + self.ttl, len(content)))
+                if self.max_size is not None:
+                    self._evict(connection, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, connection, now):
+        total, = connection.execute('SELECT size FROM total').fetchone()
+        if total <= self.max_size:
+            return
+
+        connection.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+        total, = connection.execute('SELECT size FROM total').fetchone()
+
+        evicted = []
+        if total > self.max_size:
+            for uri, size in connection.execute('SELECT uri, size FROM entries ORDER BY expires'):
+                evicted.append((uri,))
+                total -= size
+                if total <= self.max_size:
+                    break
+        connection.executemany('DELETE FROM entries WHERE uri = ?', evicted)
+
+    def delete(self, uri):
+        """
+        Removes an item from the cache.
+
+        :param str uri: the ``$uri`` of the item
+        """
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM entries WHERE uri = ?', (uri,))
+
+    def clear(self):
+        """Removes all items from the cache."""
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM entries')
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM entries WHERE expires > ?',
+                                          (time.time(),)).fetchone()[0]
+
+    def __repr__(self):
+        return '{}({}, ttl={}, max_size={})'.format(self.__class__.__name__, repr(self.path), self.ttl, self.max_size)
+
+
+class _Transaction(object):
+    # BEGIN IMMEDIATE takes the write lock up front, so that concurrent writers wait for it instead of failing to
+    # upgrade a read lock.
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.connection.execute('COMMIT')
+        else:
+            self.connection.execute('ROLLBACK')
@@ -0,0 +1,393 @@
+"""
+Command line interface for moving data in and out of a Potion API::
+
+    python -m potion_client http://localhost/api export user --where '{"active": true}' -o users.jsonl
+    python -m potion_client http://localhost/api import user users.jsonl --rate 50 --checkpoint users.checkpoint
+    python -m potion_client http://localhost/api generate -o myapi.py
+"""
+from datetime import datetime
+from itertools import islice
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+import six
+
+from potion_client import Client
+from potion_client.codegen import generate_module
+from potion_client.converter import timezone
+from potion_client.ratelimit import AdmissionControl
+
+FORMATS = ('jsonl', 'csv')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, dict) and len(value) == 1:
+        if '$ref' in value:
+            return value['$ref']
+        if '$date' in value:
+            return datetime.fromtimestamp(value['$date'] / 1000.0, timezone.utc).isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+def _binding(resource, rel):
+    try:
+        return resource._links[rel].__get__(None, resource)
+    except KeyError:
+        raise ValueError("Resource '{}' has no '{}' link".format(resource._name, rel))
+
+
+def export_instances(resource,
+                     output,
+                     format='jsonl',
+                     where=None,
+                     sort=None,
+                     columns=None,
+                     per_page=100,
+                     concurrency=4,
+                     progress=None):
+    """
+    Writes the instances of a resource to a file, one item per line, in the order returned by the API.
+
+    Up to ``concurrency`` pages are fetched at once and written before the next pages are requested, so memory use is
+    bounded by ``concurrency * per_page`` items. Items are written as parsed by the JSON backend and are not converted
+    to :class:`Resource` instances; JSON Lines output keeps the ``{"$ref"}`` and ``{"$date"}`` objects of Potion JSON.
+
+    :param resource: a :class:`Resource` class
+    :param output: a text file
+    :param str format: ``'jsonl'`` or ``'csv'``
+    :param dict where: a filter for the ``instances`` link
+    :param dict sort: a sort order for the ``instances`` link
+    :param list columns: the properties to write to a CSV file; defaults to ``$uri`` and all properties in the schema
+    :param int per_page: the number of items per page
+    :param int concurrency: the maximum number of pages fetched at once
+    :param callable progress: called with the number of items written and the total number of items after every page
+    :return: the number of items written
+    """
+    if format not in FORMATS:
+        raise ValueError("Unknown format '{}'; expected one of: {}".format(format, ', '.join(FORMATS)))
+
+    client = resource._client
+    binding = _binding(resource, 'instances')
+
+    params = {}
+    if where:
+        params['where'] = where
+    if sort:
+        params['sort'] = sort
+
+    def fetch(page):
+        request_params = dict(page=page, per_page=per_page)
+        request_params.update(params)
+        return binding.make_request(None, request_params, decode=False)
+
+    if format == 'csv':
+        if columns is None:
+            columns = ['$uri'] + sorted(name for name in resource._schema.get('properties', {})
+                                        if not name.startswith('$'))
+        writer = csv.writer(output)
+        writer.writerow(columns)
+
+        def write(item):
+            writer.writerow([_csv_value(item.get(name)) for name in columns])
+    else:
+        def write(item):
+            output.write(six.text_type(client._json.dumps(item)))
+            output.write(u'\n')
+
+    response, items = fetch(1)
+    try:
+        total_count = int(response.headers['X-Total-Count'])
+    except KeyError:
+        total_count = len(items)
+
+    count = 0
+    pages = [items]
+    next_page, page_count = 2, (total_count + per_page - 1) // per_page
+    while pages:
+        for items in pages:
+            for item in items:
+                write(item)
+            count += len(items)
+            if progress is not None:
+                progress(count, total_count)
+
+        batch = range(next_page, min(next_page + concurrency, page_count + 1))
+        next_page += len(batch)
+
+        pages = []
+        for result in client._map(fetch, batch, concurrency):
+            if isinstance(result, Exception):
+                raise result
+            pages.append(result[1])
+    return count
+
+
+def _read_checkpoint(path):
+    if path is None or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return int(f.read().strip() or 0)
+
+
+def _write_checkpoint(path, line_number):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as f:
+        f.write(str(line_number))
+    if hasattr(os, 'replace'):
+        os.replace(temporary_path, path)
+    else:
+        os.rename(temporary_path, path)
+
+
+def import_instances(resource,
+                     lines,
+                     concurrency=4,
+                     batch_size=None,
+                     checkpoint=None,
+                     rejects=None,
+                     validate=False,
+                     progress=None,
+                     on_error=None):
+    """
+    Saves items read from JSON Lines to a resource. Items with a ``$uri`` are saved through the ``update`` link of the
+    resource; other items are saved through the ``create`` link. Properties the link does not accept, such as
+    read-only properties of exported items, are left out.
+
+    Lines are read in batches of ``batch_size`` and the items of a batch are saved concurrently. Once a batch is
+    complete, the number of the last line is written to the ``checkpoint`` file and lines up to that number are
+    skipped when the import is started again. Items of an interrupted batch may be saved twice.
+
+    With ``validate``, the items of each batch are checked against the schemas of the links first and invalid items
+    are rejected without being sent.
+
+    :param resource: a :class:`Resource` class
+    :param lines: an iterable of lines of JSON
+    :param int concurrency: the maximum number of requests in flight
+    :param int batch_size: the number of lines per batch; defaults to ``8 * concurrency``
+    :param str checkpoint: the path of the checkpoint file, or None
+    :param rejects: a text file the lines that could not be saved are written to, or None
+    :param bool validate: whether to validate items before sending them
+    :param callable progress: called with the number of lines processed and the number of failures after every batch
+    :param callable on_error: called with the line number and the exception of every line that could not be saved
+    :return: a dict with the number of items ``created``, ``updated`` and ``failed``
+    """
+    client = resource._client
+    stats = {'created': 0, 'updated': 0, 'failed': 0}
+
+    def parse(line):
+        item = client._json.loads(line)
+        uri = item.get('$uri')
+        rel = 'create' if uri is None else 'update'
+
+        schema = _binding(resource, rel).link.schema
+        properties = {name: value for name, value in item.items()
+                      if not name.startswith('$') and schema.can_include_property(name)}
+
+        if uri is None:
+            return rel, properties, None
+
+        id_ = uri[uri.rfind('/') + 1:]
+        return rel, properties, int(id_) if id_.isdigit() else id_
+
+    def save(change):
+        rel, properties, id_ = change
+        if rel == 'create':
+            _binding(resource, 'create')(properties)
+            return 'created'
+
+        _binding(resource, 'update')(properties, id=id_)
+        return 'updated'
+
+    skip = _read_checkpoint(checkpoint)
+    numbered_lines = ((number, line) for number, line in enumerate(lines, 1) if number > skip)
+    batch_size = batch_size or 8 * concurrency
+    processed = skip
+
+    while True:
+        batch = list(islice(numbered_lines, batch_size))
+        if not batch:
+            break
+
+        results, changes = {}, {}
+        for number, line in batch:
+            if line.strip():
+                try:
+                    changes[number] = parse(line)
+                except Exception as e:
+                    results[number] = e
+
+        if validate:
+            for rel in ('create', 'update'):
+                numbers = sorted(number for number, change in changes.items() if change[0] == rel)
+                if numbers:
+                    errors = _binding(resource, rel).validate_many([changes[number][1] for number in numbers])
+                    for number, error in zip(numbers, errors):
+                        if error is not None:
+                            results[number] = error
+                            del changes[number]
+
+        numbers = sorted(changes)
+        results.update(zip(numbers, client._map(save, [changes[number] for number in numbers], concurrency)))
+
+        for number, line in batch:
+            result = results.get(number)
+            if isinstance(result, Exception):
+                stats['failed'] += 1
+                if rejects is not None:
+                    rejects.write(line.rstrip('\r\n') + u'\n')
+                if on_error is not None:
+                    on_error(number, result)
+            elif result is not None:
+                stats[result] += 1
+
+        processed = batch[-1][0]
+        if rejects is not None:
+            rejects.flush()
+        if checkpoint is not None:
+            _write_checkpoint(checkpoint, processed)
+        if progress is not None:
+            progress(processed, stats['failed'])
+    return stats
+
+
+def _print_progress(message):
+    def progress(*args):
+        sys.stderr.write('\r' + message.format(*args))
+        sys.stderr.flush()
+
+    return progress
+
+
+def _print_error(number, error):
+    sys.stderr.write('\rline {}: {}\n'.format(number, error))
+
+
+def _json_argument(value):
+    try:
+        return json.loads(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError('invalid JSON: {}'.format(e))
+
+
+def _open(path, mode, **kwargs):
+    if path == '-':
+        return io.open((sys.stdin if 'r' in mode else sys.stdout).fileno(), mode, closefd=False, **kwargs)
+    return io.open(path, mode, **kwargs)
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='potion-client', description='Export and import Potion API resources.')
+    parser.add_argument('url', help='the root URL of the API, e.g. http://localhost/api')
+    parser.add_argument('--schema-path', default='/schema')
+    parser.add_argument('--header', action='append', default=[], metavar='NAME:VALUE',
+                        help='a header to send with every request')
+    parser.add_argument('--auth', metavar='USER:PASSWORD', help='HTTP basic authentication')
+    parser.add_argument('--concurrency', type=int, default=4, help='the maximum number of requests in flight')
+    parser.add_argument('--rate', type=float, help='the maximum number of requests per second')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    export_parser = subparsers.add_parser('export', help='write the instances of a resource to a file')
+    export_parser.add_argument('resource')
+    export_parser.add_argument('-o', '--output', default='-', help='the output file; defaults to stdout')
+    export_parser.add_argument('-f', '--format', choices=FORMATS, default='jsonl')
+    export_parser.add_argument('--where', type=_json_argument, help='a JSON filter, e.g. \'{"active": true}\'')
+    export_parser.add_argument('--sort', type=_json_argument, help='a JSON sort order, e.g. \'{"name": false}\'')
+    export_parser.add_argument('--columns', type=lambda value: value.split(','), help='comma-separated CSV columns')
+    export_parser.add_argument('--per-page', type=int, default=100)
+
+    import_parser = subparsers.add_parser('import', help='create or update instances from a JSON Lines file')
+    import_parser.add_argument('resource')
+    import_parser.add_argument('input', nargs='?', default='-', help='the input file; defaults to stdin')
+    import_parser.add_argument('--checkpoint', help='a file to record progress in, for resuming an import')
+    import_parser.add_argument('--rejects', help='a file to write lines that could not be saved to')
+    import_parser.add_argument('--batch-size', type=int)
+    import_parser.add_argument('--validate', action='store_true', help='reject invalid lines without sending them')
+
+    generate_parser = subparsers.add_parser('generate', help='generate a module with the resource classes of the API')
+    generate_parser.add_argument('-o', '--output', default='-', help='the output file; defaults to stdout')
+    return parser
+
+
+def make_client(args):
+    session_kwargs = {}
+    if args.auth:
+        session_kwargs['auth'] = tuple(args.auth.split(':', 1))
+
+    client = Client(args.url,
+                    schema_path=args.schema_path,
+                    fetch_schema=False,
+                    admission=AdmissionControl(rate=args.rate) if args.rate else None,
+                    **session_kwargs)
+
+    for header in args.header:
+        name, _, value = header.partition(':')
+        client.session.headers[name.strip()] = value.strip()
+
+    client._fetch_schema()
+    return client
+
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    client = make_client(args)
+
+    if args.command == 'generate':
+        with _open(args.output, 'w', encoding='utf-8') as output:
+            output.write(six.text_type(generate_module(client)))
+        return 0
+
+    try:
+        resource = client._resource_classes[args.resource]
+    except KeyError:
+        parser.error("unknown resource '{}'; expected one of: {}".format(args.resource,
+                                                                         ', '.join(sorted(client._resource_classes))))
+
+    if args.command == 'export':
+        with _open(args.output, 'w', encoding='utf-8', newline='') as output:
+            count = export_instances(resource,
+                                     output,
+                                     format=args.format,
+                                     where=args.where,
+                                     sort=args.sort,
+                                     columns=args.columns,
+                                     per_page=args.per_page,
+                                     concurrency=args.concurrency,
+                                     progress=None if args.quiet else _print_progress('exported {}/{} items'))
+        if not args.quiet:
+            sys.stderr.write('\rexported {} items\n'.format(count))
+        return 0
+
+    rejects = _open(args.rejects, 'a', encoding='utf-8') if args.rejects else None
+    try:
+        with _open(args.input, 'r', encoding='utf-8') as lines:
+            stats = import_instances(resource,
+                                     lines,
+                                     concurrency=args.concurrency,
+                                     batch_size=args.batch_size,
+                                     checkpoint=args.checkpoint,
+                                     rejects=rejects,
+                                     validate=args.validate,
+                                     progress=None if args.quiet else _print_progress('processed {} lines, '
+                                                                                      '{} failed'),
+                                     on_error=_print_error)
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+    if not args.quiet:
+        sys.stderr.write('\rcreated {created}, updated {updated}, failed {failed}\n'.format(**stats))
+    return 1 if stats['failed'] else 0
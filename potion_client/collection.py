@@ -1,17 +1,86 @@
-import collections
+from bisect import bisect_right, insort
 from pprint import pformat
+from threading import Lock, RLock
+import collections
+import time
 
+from potion_client.columns import ColumnBuilder
+from potion_client.converter import LazyDecodedList, PotionJSONDecoder
 from potion_client.utils import escape
 
 
+class AdaptivePerPage(object):
+    """
+    Adjusts the number of items requested per page between the fetches of a :class:`PaginatedList`.
+
+    Page sizes are always ``initial * 2 ** n`` so that pages of different sizes line up with the page boundaries
+    of the server. The page size doubles while pages arrive in less than half of ``target_latency`` and is halved
+    when a page takes longer than ``target_latency`` or its response is larger than ``max_response_size`` bytes.
+
+    :param int initial: size of the first page, and the smallest page size used
+    :param int maximum: largest page size; usually the ``maximum`` of ``per_page`` in the link schema
+    :param float target_latency: target time in seconds for fetching a single page
+    :param int max_response_size: largest acceptable response size in bytes, or None
+    """
+
+    def __init__(self, initial=10, maximum=100, target_latency=0.5, max_response_size=None):
+        self.initial = initial
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.max_response_size = max_response_size
+        self.per_page = initial
+
+    def limit(self, maximum):
+        if maximum is not None and (self.maximum is None or maximum < self.maximum):
+            self.maximum = maximum
+        if self.maximum is not None and self.initial > self.maximum:
+            self.initial = self.per_page = self.maximum
+
+    def record(self, per_page, elapsed, size):
+        if elapsed > self.target_latency or (self.max_response_size is not None and size > self.max_response_size):
+            self.per_page = max(self.initial, min(self.per_page, per_page) // 2)
+        elif elapsed < self.target_latency / 2 and (self.maximum is None or per_page * 2 <= self.maximum):
+            self.per_page = max(self.per_page, per_page * 2)
+
+    def page_for(self, index, sequential=False):
+        """
+        :param int index: index of the item to fetch
+        :param bool sequential: whether the page should start at ``index`` if possible
+        :return: a ``(page, per_page)`` tuple for the page containing the item
+        """
+        per_page = self.per_page
+        if sequential:
+            while per_page > self.initial and index % per_page:
+                per_page //= 2
+        return index // per_page + 1, per_page
+
+
 class PaginatedList(collections.Sequence):
     def __init__(self, binding, params):
         self._pages = {}
-        self._per_page = per_page = params.pop('per_page', 20)
+        self._page_locks = {}
+        self._lock = RLock()
         self._binding = binding
         self._total_count = 0
+        self._adaptive = None
+        self._raw_page = None
+
+        per_page = params.pop('per_page', 20)
+        if per_page == 'auto':
+            per_page = AdaptivePerPage()
+
+        if isinstance(per_page, AdaptivePerPage):
+            self._adaptive = per_page
+            self._offsets = []
+            try:
+                per_page.limit(binding.link.schema['properties']['per_page'].get('maximum'))
+            except KeyError:
+                pass
+            per_page = per_page.per_page
+
+        self._per_page = per_page
         self._request_params = params
-        self.fetch_page(1, per_page)
+        self.fetch_page(1, per_page, decode=False)
 
     def __getitem__(self, item):
         if isinstance(item, slice):
@@ -20,25 +89,152 @@ class PaginatedList(collections.Sequence):
         if item < 0 or item >= self._total_count:
             raise IndexError()
 
+        if self._adaptive is not None:
+            return self._get_adaptive(item)
+
         page, offset = item // self._per_page + 1, item % self._per_page
         if page not in self._pages:
-            self.fetch_page(page, self._per_page)
+            with self._lock:
+                page_lock = self._page_locks.setdefault(page, Lock())
+
+            # NOTE different pages can be fetched by different threads at the same time.
+            with page_lock:
+                if page not in self._pages:
+                    self.fetch_page(page, self._per_page)
         return self._pages[page][offset]
 
+    def _get_adaptive(self, item):
+        with self._lock:
+            return self._get_adaptive_locked(item)
+
+    def _get_adaptive_locked(self, item):
+        # Pages are stored by their offset. Because page sizes are always a power-of-two multiple of the initial
+        # page size, any two pages are either disjoint or one contains the other.
+        index = bisect_right(self._offsets, item) - 1
+        if index >= 0:
+            start = self._offsets[index]
+            if item < start + len(self._pages[start]):
+                return self._pages[start][item - start]
+
+        sequential = index >= 0 and item == self._offsets[index] + len(self._pages[self._offsets[index]])
+        page, per_page = self._adaptive.page_for(item, sequential=sequential)
+        self.fetch_page(page, per_page)
+        start = (page - 1) * per_page
+        return self._pages[start][item - start]
+
     def __len__(self):
         return self._total_count
 
-    def fetch_page(self, page, per_page):
+    def fetch_page(self, page, per_page, decode=True):
+        """
+        :param bool decode: whether to convert the items to Potion objects right away; if False, the items are kept as
+            parsed from JSON for :meth:`raw_pages` and converted when they are first accessed
+        """
         params = dict(page=page, per_page=per_page)
         params.update(self._request_params)
-        response, response_data = self._binding.make_request(None, params)
+
+        started = time.time()
+        response, response_data = self._binding.make_request(None, params, decode=decode)
 
         try:
             self._total_count = int(response.headers['X-Total-Count'])
         except KeyError:
             self._total_count = len(response_data)
 
-        self._pages[page] = response_data
+        if not decode and response_data is not None:
+            self._raw_page = (page, per_page, response_data)
+            response_data = LazyDecodedList(response_data, PotionJSONDecoder(client=self._binding.owner._client), 1)
+
+        if self._adaptive is None:
+            self._pages[page] = response_data
+            return
+
+        self._adaptive.record(per_page, time.time() - started, len(response.content))
+
+        start, end = (page - 1) * per_page, page * per_page
+        for offset in [offset for offset in self._offsets if start <= offset < end]:
+            self._offsets.remove(offset)
+            del self._pages[offset]
+        insort(self._offsets, start)
+        self._pages[start] = response_data
+
+    def raw_pages(self, per_page=None):
+        """
+        Fetches the pages of this list without converting the items to Potion objects. The first page, which is
+        fetched when the list is created, is not requested again if it has the same size.
+
+        :param int per_page: the number of items per page; defaults to the page size of this list
+        :return: an iterator over the pages, each a list of items as parsed by the JSON backend
+        """
+        if per_page is None:
+            per_page = self._per_page if self._adaptive is None else self._adaptive.maximum or self._per_page
+
+        page = 1
+        while (page - 1) * per_page < self._total_count:
+            if self._raw_page is not None and self._raw_page[:2] == (page, per_page):
+                response_data = self._raw_page[2]
+            else:
+                params = dict(page=page, per_page=per_page)
+                params.update(self._request_params)
+                response, response_data = self._binding.make_request(None, params, decode=False)
+            if not response_data:
+                return
+            yield response_data
+            page += 1
+
+    def to_columns(self, columns=None, per_page=None):
+        """
+        Streams the items of this list into one array per property, typed using the schema of the resource.
+        Integers, numbers and booleans become numeric arrays, ``{"$date"}`` properties become ``datetime64[ms]``
+        arrays and ``{"$ref"}`` properties become arrays of URIs. No :class:`Resource` instances are created.
+
+        :param list columns: the names of the properties to export; defaults to ``$uri`` and all properties
+        :param int per_page: the number of items per page
+        :return: a dict of property names to NumPy arrays, or to lists if NumPy is not installed
+        """
+        return self._build_columns(columns, per_page).build()
+
+    def to_dataframe(self, columns=None, per_page=None):
+        """
+        Like :meth:`to_columns`, but returns a :class:`pandas.DataFrame`.
+        """
+        import pandas
+        builder = self._build_columns(columns, per_page)
+        return pandas.DataFrame(builder.build(), columns=[name for name, kind in builder.columns])
+
+    def _build_columns(self, columns, per_page):
+        builder = ColumnBuilder.from_schema(self._binding.owner._schema, columns)
+        for page in self.raw_pages(per_page):
+            builder.add_page(page)
+        return builder
+
+    def partition(self, n, per_page=None):
+        """
+        Splits the pages of this list into ``n`` shards that can be scanned independently, for instance by the
+        workers of a thread or process pool. The number of items is taken from the first page, so items that are
+        added while the shards are being scanned may be missed.
+
+        :param int n: the number of shards
+        :param int per_page: the page size of the shards; defaults to the page size of this list
+        :return: a list of at most ``n`` :class:`PaginatedListShard` objects that can be pickled
+        """
+        if per_page is None:
+            per_page = self._per_page if self._adaptive is None else self._adaptive.per_page
+
+        page_count = (self._total_count + per_page - 1) // per_page
+        n = max(1, min(n, page_count))
+
+        shards = []
+        for i in range(n):
+            start_page, end_page = page_count * i // n + 1, page_count * (i + 1) // n + 1
+            shards.append(PaginatedListShard(self._binding.owner,
+                                             self._binding.link.rel,
+                                             self._request_params,
+                                             per_page,
+                                             start_page,
+                                             end_page,
+                                             total_count=self._total_count))
+        return shards
 
     def _repr_html_(self):
         if len(self) <= 10:
@@ -65,3 +261,60 @@ class PaginatedList(collections.Sequence):
         return 'PaginatedList({params})'.format(params=', '.join(
             ['{}.{}'.format(self._binding.owner.__name__, self._binding.link.rel)] +
             ['{}={}'.format(k, repr(v)) for k, v in self._request_params.items()]), )
+
+
+class PaginatedListShard(object):
+    """
+    A range of pages of a :class:`PaginatedList`. Iterating over a shard fetches its pages one at a time.
+
+    :param resource: the :class:`Resource` class the list belongs to
+    :param str rel: the relation of the link that returns the list, usually ``'instances'``
+    :param dict params: the parameters of the list, such as ``where`` and ``sort``
+    :param int per_page: the number of items per page
+    :param int start_page: the first page of the shard
+    :param int end_page: the page after the last page of the shard
+    """
+
+    def __init__(self, resource, rel, params, per_page, start_page, end_page, total_count=None):
+        self._client = resource._client
+        self._resource_name = resource._name
+        self.rel = rel
+        self.params = params
+        self.per_page = per_page
+        self.start_page = start_page
+        self.end_page = end_page
+        self.total_count = total_count
+
+    @property
+    def _binding(self):
+        resource = self._client._resource_classes[self._resource_name]
+        return resource._links[self.rel].__get__(None, resource)
+
+    def pages(self):
+        binding = self._binding
+        for page in range(self.start_page, self.end_page):
+            params = dict(page=page, per_page=self.per_page)
+            params.update(self.params)
+            response, response_data = binding.make_request(None, params)
+            if not response_data:
+                return
+            yield response_data
+
+    def __iter__(self):
+        for page in self.pages():
+            for item in page:
+                yield item
+
+    def __len__(self):
+        start = (self.start_page - 1) * self.per_page
+        end = (self.end_page - 1) * self.per_page
+        if self.total_count is not None:
+            end = min(end, self.total_count)
+        return max(0, end - start)
+
+    def __repr__(self):
+        return 'PaginatedListShard({params})'.format(params=', '.join(
+            ['{}.{}'.format(self._resource_name, self.rel),
+             'pages={}..{}'.format(self.start_page, self.end_page - 1),
+             'per_page={}'.format(self.per_page)] +
+            ['{}={}'.format(k, repr(v)) for k, v in self.params.items()]))
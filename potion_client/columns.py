@@ -0,0 +1,96 @@
+"""
+Columnar export of the raw items of a :class:`PaginatedList`, typed using the JSON schema of its resource.
+"""
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def column_kind(schema):
+    """
+    :param dict schema: the JSON schema of a property
+    :return: one of ``'date'``, ``'ref'``, ``'integer'``, ``'number'``, ``'boolean'``, ``'string'`` or ``'object'``
+    """
+    properties = schema.get('properties', {})
+    if '$date' in properties:
+        return 'date'
+    if '$ref' in properties:
+        return 'ref'
+
+    types = schema.get('type', ())
+    if not isinstance(types, (list, tuple)):
+        types = (types,)
+
+    for kind in ('integer', 'number', 'boolean', 'string'):
+        if kind in types:
+            return kind
+    return 'object'
+
+
+def _convert_value(kind, value):
+    if kind == 'date':
+        return value['$date'] if isinstance(value, dict) else None
+    if kind == 'ref':
+        return value['$ref'] if isinstance(value, dict) else value
+    return value
+
+
+def _to_array(kind, values):
+    if kind == 'date':
+        return numpy.array(values, dtype='datetime64[ms]')
+
+    has_null = None in values
+    if kind == 'integer' and not has_null:
+        return numpy.array(values, dtype='int64')
+    if kind in ('integer', 'number'):
+        return numpy.array([numpy.nan if value is None else value for value in values], dtype='float64')
+    if kind == 'boolean' and not has_null:
+        return numpy.array(values, dtype='bool')
+
+    array = numpy.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+class ColumnBuilder(object):
+    """
+    Collects the values of raw items into one buffer per column. Each page of values is converted to a typed
+    NumPy array as soon as it is added; without NumPy, columns are plain lists.
+
+    :param list columns: a list of ``(name, kind)`` pairs, one for each column; see :func:`column_kind`
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._chunks = {name: [] for name, kind in columns}
+
+    @classmethod
+    def from_schema(cls, schema, columns=None):
+        properties = schema.get('properties', {})
+        if columns is None:
+            columns = ['$uri'] + [name for name in properties if not name.startswith('$')]
+        return cls([(name, column_kind(properties.get(name, {}))) for name in columns])
+
+    def add_page(self, items):
+        for name, kind in self.columns:
+            values = [_convert_value(kind, item.get(name)) for item in items]
+            if numpy is not None:
+                values = _to_array(kind, values)
+            self._chunks[name].append(values)
+
+    def build(self):
+        """
+        :return: a dict of column names to NumPy arrays, or to lists if NumPy is not installed
+        """
+        result = {}
+        for name, kind in self.columns:
+            chunks = self._chunks[name]
+            if numpy is None:
+                result[name] = [value for chunk in chunks for value in chunk]
+            elif chunks:
+                result[name] = numpy.concatenate(chunks)
+            else:
+                result[name] = _to_array(kind, [])
+        return result
@@ -0,0 +1,117 @@
+from threading import Lock
+import time
+import zlib
+
+import six
+
+
+class CompressionStats(object):
+    """
+    Totals for the request bodies seen by a :class:`RequestCompression`, for tuning its threshold.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.requests = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def record(self, bytes_in, bytes_out=None, seconds=0.0):
+        with self._lock:
+            self.requests += 1
+            if bytes_out is not None:
+                self.compressed += 1
+                self.bytes_in += bytes_in
+                self.bytes_out += bytes_out
+                self.seconds += seconds
+
+    @property
+    def ratio(self):
+        """Compressed size relative to the uncompressed size of all compressed bodies."""
+        if not self.bytes_in:
+            return None
+        return float(self.bytes_out) / self.bytes_in
+
+    def __repr__(self):
+        return '{}(requests={}, compressed={}, ratio={}, seconds={})'.format(self.__class__.__name__,
+                                                                           self.requests,
+                                                                           self.compressed,
+                                                                           self.ratio,
+                                                                           self.seconds)
+
+
+class RequestCompression(object):
+    """
+    Compresses request bodies larger than ``threshold`` bytes and records the compression ratio and time in
+    :attr:`stats`.
+
+    :param str encoding: ``'gzip'``, ``'deflate'`` or ``'zstd'``; zstd requires the ``zstandard`` package
+    :param int threshold: the minimum size of a request body in bytes before it is compressed
+    :param int level: the compression level, or None for the default of the encoding
+    """
+
+    def __init__(self, encoding='gzip', threshold=1024, level=None):
+        if encoding == 'gzip':
+            self._compress = self._zlib_compressor(level, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._compress = self._zlib_compressor(level, zlib.MAX_WBITS)
+        elif encoding == 'zstd':
+            import zstandard
+            self._compress = zstandard.ZstdCompressor(**({'level': level} if level is not None else {})).compress
+        else:
+            raise ValueError("Unsupported content encoding: '{}'".format(encoding))
+
+        self.encoding = encoding
+        self.threshold = threshold
+        self.level = level
+        self.stats = CompressionStats()
+
+    def __reduce__(self):
+        return self.__class__, (self.encoding, self.threshold, self.level)
+
+    @staticmethod
+    def _zlib_compressor(level, wbits):
+        def compress(data):
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level, zlib.DEFLATED, wbits)
+            return compressor.compress(data) + compressor.flush()
+        return compress
+
+    def compress(self, body):
+        """
+        :param body: the request body
+        :return: a ``(body, encoding)`` tuple; the encoding is None if the body was not compressed
+        """
+        if isinstance(body, six.text_type):
+            body = body.encode('utf-8')
+
+        if len(body) < self.threshold:
+            self.stats.record(len(body))
+            return body, None
+
+        started = time.time()
+        compressed = self._compress(body)
+        self.stats.record(len(body), len(compressed), time.time() - started)
+        return compressed, self.encoding
+
+    def __repr__(self):
+        return '{}({}, threshold={})'.format(self.__class__.__name__, repr(self.encoding), self.threshold)
+
+
+def get_compression(compression):
+    """
+    :param compression: None, False, the name of an encoding or a :class:`RequestCompression`
+    """
+    if isinstance(compression, six.string_types):
+        return RequestCompression(compression)
+    return compression
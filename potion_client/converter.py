@@ -1,4 +1,5 @@
 import calendar
+import collections
 from functools import partial
 from json import JSONEncoder, JSONDecoder
 from datetime import date, datetime
@@ -31,7 +32,12 @@ except ImportError:
 
 
 class PotionJSONEncoder(JSONEncoder):
-    def encode(self, o):
+    def convert(self, o):
+        """
+        Converts dates and references within an object to their Potion JSON representation.
+
+        :return: an object consisting only of types that any JSON backend can serialize
+        """
         root_id = id(o)
         if self.check_circular:
             markers = {}
@@ -67,15 +73,109 @@ class PotionJSONEncoder(JSONEncoder):
 
             return o
 
-        return JSONEncoder.encode(self, _encode(o))
+        return _encode(o)
+
+    def encode(self, o):
+        return JSONEncoder.encode(self, self.convert(o))
+
+
+class LazyDecodedList(collections.Sequence):
+    """
+    A list of items as parsed from JSON that are converted by a :class:`PotionJSONDecoder` when they are first
+    accessed.
+    """
+
+    def __init__(self, items, decoder, depth):
+        self._items = list(items)
+        self._pending = set(range(len(self._items)))
+        self._decoder = decoder
+        self._depth = depth
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+
+        if index < 0:
+            index += len(self._items)
+
+        value = self._items[index]
+        if index in self._pending:
+            value = self._items[index] = self._decoder._decode(value, self._depth)
+            self._pending.discard(index)
+        return value
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazyDecodedList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class LazyDecodedDict(collections.MutableMapping):
+    """
+    The properties of an instance as parsed from JSON. Each value is converted by a :class:`PotionJSONDecoder` when
+    it is first accessed.
+    """
+
+    def __init__(self, properties, decoder, depth):
+        self._values = dict(properties)
+        self._pending = set(self._values)
+        self._decoder = decoder
+        self._depth = depth
+
+    def __getitem__(self, key):
+        value = self._values[key]
+        if key in self._pending:
+            value = self._values[key] = self._decoder._decode(value, self._depth)
+            self._pending.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+        self._pending.discard(key)
+
+    def __delitem__(self, key):
+        del self._values[key]
+        self._pending.discard(key)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __iter__(self):
+        return iter(list(self._values))
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return repr(dict(self))
 
 
 class PotionJSONDecoder(JSONDecoder):
-    def __init__(self, client, referrer=None, uri_to_instance=True, default_instance=None, *args, **kwargs):
+    """
+    :param Client client:
+    :param str referrer: the URI of the document being decoded, used to resolve relative references
+    :param bool uri_to_instance: whether to decode objects with a ``$uri`` into resource instances
+    :param Resource default_instance: an unsaved instance to use for the object at the root of the document
+    :param bool lazy: whether to convert the items of a list and the properties of an instance only when they are
+        accessed; defaults to :attr:`Client.lazy_decoding`
+    """
+
+    def __init__(self, client, referrer=None, uri_to_instance=True, default_instance=None, lazy=None, *args, **kwargs):
         self.client = client
         self.referrer = referrer
         self.uri_to_instance = uri_to_instance
         self.default_instance = default_instance
+        self.lazy = lazy if lazy is not None else getattr(client, 'lazy_decoding', False)
         JSONDecoder.__init__(self, *args, **kwargs)
 
     def _decode(self, o, depth=0):
@@ -95,15 +195,26 @@ class PotionJSONDecoder(JSONDecoder):
                 else:
                     instance = self.client.instance(o['$uri'])
 
-                instance._status = 200
-                instance._properties.update({k: self._decode(v, depth + 1) for k, v in o.items()})
+                if self.lazy:
+                    instance._resolve_with(LazyDecodedDict(o, self, depth + 1))
+                else:
+                    instance._resolve_with({k: self._decode(v, depth + 1) for k, v in o.items()})
                 return instance
 
             return {k: self._decode(v, depth + 1) for k, v in o.items()}
         if isinstance(o, (list, tuple)):
+            if self.lazy and depth == 0:
+                return LazyDecodedList(o, self, depth + 1)
             return [self._decode(v, depth + 1) for v in o]
         return o
 
+    def convert(self, o):
+        """
+        Converts Potion JSON objects within an object that has already been parsed, such as
+        ``{"$date": 1451060269000}`` or ``{"$ref": "/user/1"}``, into dates, references and resource instances.
+        """
+        return self._decode(o)
+
     def decode(self, s, *args, **kwargs):
         o = JSONDecoder.decode(self, s, *args, **kwargs)
         return self._decode(o)
@@ -121,38 +232,117 @@ class PotionJSONSchemaDecoder(JSONDecoder):
         self.referrer = referrer
         JSONDecoder.__init__(self, *args, **kwargs)
 
+    def convert(self, o):
+        return schema_resolve_refs(o,
+                                   partial(self.client.instance, cls=JSONSchemaReference, client=self.client),
+                                   interned=getattr(self.client, '_schema_interned', None))
+
     def decode(self, s, *args, **kwargs):
         o = JSONDecoder.decode(self, s, *args, **kwargs)
-        return schema_resolve_refs(o, partial(self.client.instance,
-                                              cls=JSONSchemaReference,
-                                              client=self.client))
+        return self.convert(o)
+
+
+class _LocalReference(object):
+    __slots__ = ('pointer', 'original')
+
+    def __init__(self, pointer, original):
+        self.pointer = pointer
+        self.original = original
+
+
+def _intern_key(o):
+    # Children of an interned container are interned themselves, so they can be compared by identity. Keys are in
+    # document order, which is the same for schemas serialized by the same server.
+    if isinstance(o, dict):
+        return (dict,) + tuple((k, id(v) if isinstance(v, (dict, list, tuple)) else (v.__class__, v))
+                               for k, v in o.items())
+    return (list,) + tuple(id(v) if isinstance(v, (dict, list, tuple)) else (v.__class__, v) for v in o)
 
 
-def schema_resolve_refs(schema, ref_resolver=None, root=None):
+def schema_resolve_refs(schema, ref_resolver=None, interned=None):
     """
-    Helper method for decoding references. Self-references are resolved automatically; other references are
+    Helper method for decoding references. References within the schema, such as ``{"$ref": "#"}`` or
+    ``{"$ref": "#/definitions/name"}``, are resolved once the whole schema has been processed; other references are
     resolved using a callback function.
 
+    The schema is not modified. Only objects and arrays that contain a reference are copied; all other parts of the
+    resolved schema are shared with the original. If ``interned`` is a dict, objects and arrays without references
+    are replaced with an equal object from it, or added to it, so that identical parts of several schemas are stored
+    only once. Resolved schemas must therefore be treated as read-only.
+
     :param object schema:
     :param callable ref_resolver:
-    :param None root:
-    :return:
+    :param dict interned: a cache of schema parts shared between calls, or None
+    :return: the schema with resolved references
     """
-    # FIXME more stable implementation that only attempts to resolve {"$ref"} objects where they are allowed.
-    if isinstance(schema, dict):
-        if len(schema) == 1 and "$ref" in schema and isinstance(schema["$ref"], six.string_types):
-            reference = schema["$ref"]
-            if reference.startswith("#"):
-                # TODO should also resolve any paths within the reference, which would need to be deferred.
-                return root
-            return ref_resolver(reference)
-
-        resolved = {}
-        for k, v in schema.items():
-            resolved[k] = schema_resolve_refs(v,
-                                              ref_resolver=ref_resolver,
-                                              root=root if root is not None else resolved)
-        return resolved
-    if isinstance(schema, (list, tuple)):
-        return [schema_resolve_refs(v, ref_resolver=ref_resolver, root=root) for v in schema]
-    return schema
+    local_references = []
+
+    # returns the resolved object and whether it is free of references
+    def resolve(o):
+        if isinstance(o, dict):
+            if len(o) == 1 and "$ref" in o and isinstance(o["$ref"], six.string_types):
+                reference = o["$ref"]
+                if reference.startswith("#"):
+                    return _LocalReference(reference, o), False
+                if ref_resolver is None:
+                    return o, False
+                return ref_resolver(reference), False
+            items = o.items()
+        elif isinstance(o, (list, tuple)):
+            items = enumerate(o)
+        else:
+            return o, True
+
+        pure, copy = True, None
+        for k, v in items:
+            if not isinstance(v, (dict, list, tuple)):
+                continue
+
+            resolved, resolved_pure = resolve(v)
+            pure = pure and resolved_pure
+            if resolved is not v:
+                if copy is None:
+                    copy = dict(o) if isinstance(o, dict) else list(o)
+                copy[k] = resolved
+                if isinstance(resolved, _LocalReference):
+                    local_references.append((copy, k, resolved))
+
+        result = o if copy is None else copy
+        if pure and interned is not None:
+            result = interned.setdefault(_intern_key(result), result)
+        return result, pure
+
+    root, _ = resolve(schema)
+    if isinstance(root, _LocalReference):
+        return root.original
+
+    targets = {}
+
+    def target(reference, visiting):
+        pointer = reference.pointer
+        if pointer in targets:
+            return targets[pointer]
+        if pointer in visiting:
+            return reference.original
+
+        visiting.add(pointer)
+        value = root
+        try:
+            for token in pointer[1:].split('/')[1:]:
+                token = token.replace('~1', '/').replace('~0', '~')
+                if isinstance(value, _LocalReference):
+                    value = target(value, visiting)
+                value = value[int(token)] if isinstance(value, list) else value[token]
+            if isinstance(value, _LocalReference):
+                value = target(value, visiting)
+        except (KeyError, IndexError, ValueError, TypeError):
+            value = reference.original
+        finally:
+            visiting.discard(pointer)
+
+        targets[pointer] = value
+        return value
+
+    for container, key, reference in local_references:
+        container[key] = target(reference, set())
+    return root
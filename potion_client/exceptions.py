@@ -4,3 +4,7 @@ class MultipleItemsFound(Exception):
 
 class ItemNotFound(Exception):
     pass
+
+
+class DeadlineExceeded(Exception):
+    pass
@@ -0,0 +1,114 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+import time
+
+
+class HedgingPolicy(object):
+    """
+    Sends a duplicate of an idempotent request when no response has arrived after a delay, and uses whichever
+    response arrives first. The delay is the given percentile of recent response times.
+
+    :param float percentile: the percentile of recent response times after which a request is hedged
+    :param float initial_delay: the delay in seconds used until ``min_samples`` response times have been recorded
+    :param float max_fraction: the maximum fraction of requests that may be hedged
+    :param int window: the number of recent response times to keep
+    :param int min_samples: the number of response times required before the percentile is used
+    :param int max_workers: the number of threads used for sending requests
+    """
+
+    def __init__(self,
+                 percentile=95,
+                 initial_delay=0.1,
+                 max_fraction=0.05,
+                 window=1000,
+                 min_samples=20,
+                 max_workers=16):
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.max_workers = max_workers
+        self.requests = 0
+        self.hedged = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = Lock()
+        self._executor = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_executor'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @property
+    def delay(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100.0))]
+
+    def _submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def _reserve_hedge(self):
+        with self._lock:
+            if self.hedged >= self.max_fraction * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def send(self, send, request, **kwargs):
+        """
+        :param callable send: a function that sends a prepared request and returns the response,
+            e.g. :meth:`requests.Session.send`
+        :param requests.PreparedRequest request: an idempotent request
+        """
+        with self._lock:
+            self.requests += 1
+
+        started = time.time()
+        primary = self._submit(send, request, **kwargs)
+        done, _ = wait([primary], timeout=self.delay)
+
+        if done or not self._reserve_hedge():
+            response = primary.result()
+            self._record(time.time() - started)
+            return response
+
+        hedge = self._submit(send, request.copy(), **kwargs)
+        pending = {primary, hedge}
+        failed = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    self._record(time.time() - started)
+                    return future.result()
+                failed = failed or future
+        return failed.result()
+
+    def _record(self, elapsed):
+        with self._lock:
+            self._latencies.append(elapsed)
+
+    def __repr__(self):
+        return '{}(percentile={}, max_fraction={})'.format(self.__class__.__name__,
+                                                           self.percentile,
+                                                           self.max_fraction)
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
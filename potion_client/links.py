@@ -1,13 +1,14 @@
-import json
 import re
 
 from requests import Request
 from requests.exceptions import HTTPError
 
-from potion_client import PotionJSONDecoder
 from potion_client.collection import PaginatedList
-from potion_client.converter import PotionJSONEncoder
+from potion_client.converter import PotionJSONDecoder
+from potion_client.resource import Reference
 from potion_client.schema import Schema
+from potion_client.streaming import iter_json_array
+from potion_client.validation import compile_validator, validation_error
 
 
 class Link(object):
@@ -19,6 +20,11 @@ class Link(object):
         self.rel = rel
         self.schema = Schema(schema)
         self.target_schema = Schema(target_schema)
+        self.compression = None
+        self.hedging = None
+        self.admission = None
+        self.validation = None
+        self._validator = None
 
     @property
     def requires_instance(self):
@@ -30,6 +36,41 @@ class Link(object):
             return 'page' in schema_properties and 'per_page' in schema_properties
         return False
 
+    @property
+    def validator(self):
+        """
+        A :class:`jsonschema.Draft4Validator` for the schema of this link, compiled when it is first used. ``PATCH``
+        and ``update`` links accept partial updates, so the properties required by the resource may be left out.
+        """
+        if self._validator is None:
+            partial = self.method == 'PATCH' or self.rel == 'update'
+            self._validator = compile_validator(self.schema._schema, partial)
+        return self._validator
+
+    def validate(self, data):
+        """
+        Checks data against the schema of this link without sending it.
+
+        :raises jsonschema.ValidationError: if the data is not valid
+        """
+        if self.schema:
+            error = validation_error(self.validator, data)
+            if error is not None:
+                raise error
+
+    def validate_many(self, items):
+        """
+        Checks a list of items against the schema of this link, for instance the rows of an import before
+        they are created.
+
+        :return: a list with None for each valid item and a :class:`jsonschema.ValidationError` for each invalid item
+        """
+        if not self.schema:
+            return [None] * len(items)
+
+        validator = self.validator
+        return [validation_error(validator, item) for item in items]
+
     def __get__(self, instance, owner):
         return LinkBinding(self, instance, owner)
 
@@ -41,10 +82,11 @@ class LinkBinding(object):
         self.owner = owner
 
     def request_factory(self, data, params):
+        client = self.owner._client
         if self.instance is None:
-            request_url = self.owner._client._root_url + self.link.href.format(**params)
+            request_url = client._root_url + self.link.href.format(**params)
         else:
-            request_url = self.owner._client._root_url + self.link.href.format(id=self.instance.id, **self.instance)
+            request_url = client._root_url + self.link.href.format(id=self.instance.id, **self.instance)
 
         request_data = data
         request_params = {name: value for name, value in params.items()
@@ -55,16 +97,36 @@ class LinkBinding(object):
         elif isinstance(data, dict):
             request_params = data
 
+        # Link.validation overrides Client.validation
+        validation = self.link.validation
+        if validation is None:
+            validation = client.validation
+
+        if validation:
+            self.link.validate(request_params if self.link.method == 'GET' else request_data)
+
         if self.link.method == 'GET':
             req = Request(self.link.method,
                           request_url,
-                          params={k: json.dumps(v, cls=PotionJSONEncoder)
-                                  for k, v in request_params.items()})
+                          params={k: client._encode(v) for k, v in request_params.items()})
         else:
+            headers = {'content-type': 'application/json'}
+            body = client._encode(request_data)
+
+            # Link.compression overrides Client.compression; False disables compression for the link.
+            compression = self.link.compression
+            if compression is None:
+                compression = client.compression
+
+            if compression:
+                body, encoding = compression.compress(body)
+                if encoding is not None:
+                    headers['content-encoding'] = encoding
+
             req = Request(self.link.method,
                           request_url,
-                          headers={'content-type': 'application/json'},
-                          data=json.dumps(request_data, cls=PotionJSONEncoder))
+                          headers=headers,
+                          data=body)
         return req
 
     def raise_for_status(self, response):
@@ -86,11 +148,13 @@ class LinkBinding(object):
         if http_error_msg:
             raise HTTPError(http_error_msg, response=response)
 
-    def make_request(self, data, params):
+    def make_request(self, data, params, decode=True):
+        """
+        :param bool decode: whether to convert the response to Potion objects; if False, the response data is
+            returned as parsed by the JSON backend
+        """
         req = self.request_factory(data, params)
-        prepared_request = self.owner._client.session.prepare_request(req)
-
-        response = self.owner._client.session.send(prepared_request)
+        response = self.owner._client._send(req, link=self.link)
 
         # return error for some error conditions
         self.raise_for_status(response)
@@ -98,9 +162,93 @@ class LinkBinding(object):
         if response.status_code == 204:
             return response, None
 
-        return response, response.json(cls=PotionJSONDecoder,
-                                       client=self.owner._client,
-                                       default_instance=self.instance)
+        if not decode:
+            return response, self.owner._client._json.loads(response.content)
+
+        return response, self.owner._client._decode(response.content, default_instance=self.instance)
+
+    def _stream_request(self, data, params, chunk_size=65536):
+        client = self.owner._client
+        req = self.request_factory(data, params)
+        response = client._send(req, link=self.link, stream=True)
+
+        try:
+            self.raise_for_status(response)
+        except Exception:
+            response.close()
+            raise
+
+        def items():
+            try:
+                if response.status_code == 204:
+                    return
+                decoder = PotionJSONDecoder(client=client)
+                for element in iter_json_array(response.iter_content(chunk_size)):
+                    yield decoder._decode(client._json.loads(element), 1)
+            finally:
+                response.close()
+
+        return response, items()
+
+    def stream(self, *arg, **params):
+        """
+        Like calling the link, but parses a list response incrementally while it is received and yields each item as
+        soon as it has been parsed. Memory use is bounded by the size of a single item. For paginated links, pages are
+        fetched one after another until all items have been returned.
+
+        :param int chunk_size: the number of bytes to read from the response at a time
+        :return: an iterator over the decoded items
+        """
+        chunk_size = params.pop('chunk_size', 65536)
+        data = arg[0] if arg else None
+
+        if not self.link.returns_pagination():
+            response, items = self._stream_request(data, params, chunk_size)
+            for item in items:
+                yield item
+            return
+
+        page = params.pop('page', 1)
+        per_page = params.pop('per_page', 20)
+        while True:
+            request_params = dict(page=page, per_page=per_page)
+            request_params.update(params)
+            response, items = self._stream_request(None, request_params, chunk_size)
+
+            count = 0
+            for item in items:
+                count += 1
+                yield item
+
+            total_count = response.headers.get('X-Total-Count')
+            if count < per_page or (total_count is not None and page * per_page >= int(total_count)):
+                return
+            page += 1
+
+    def map(self, items, concurrency=8, ordered=True):
+        """
+        Calls the link for each of a list of items, with up to ``concurrency`` requests in flight over the session of
+        the client. Each item is either an instance to call the link on, a dict of parameters, or an
+        ``(instance, params)`` tuple::
+
+            for result in Item.archive.map(items, concurrency=16):
+                ...
+
+        :param items: an iterable of instances, dicts of parameters or tuples of both
+        :param int concurrency: the maximum number of requests in flight
+        :param bool ordered: whether to return the results in the order of the items or as soon as they are ready
+        :return: an iterator over the decoded result of each call, or the exception raised by it
+        """
+
+        def call(item):
+            instance, params = self.instance, item
+            if isinstance(item, tuple):
+                instance, params = item
+            elif isinstance(item, Reference):
+                instance, params = item, {}
+            return self.link.__get__(instance, self.owner)(**params)
+
+        return self.owner._client._map(call, items, concurrency, ordered=ordered)
 
     def __getattr__(self, item):
         return getattr(self.link, item)
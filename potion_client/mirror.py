@@ -0,0 +1,166 @@
+import collections
+
+from potion_client.converter import PotionJSONDecoder
+
+
+class Mirror(collections.Mapping):
+    """
+    A local copy of the instances of a resource that is kept up to date with delta queries.
+
+    The first :meth:`sync` loads all instances. Later calls only fetch instances whose ``field`` is greater than the
+    largest value seen so far (the watermark), using ``where={field: {"$gt": watermark}}``. Items are kept in ``store``
+    as parsed from JSON, keyed by their ``$uri``, together with the watermark. Instances that are deleted on the
+    server are not removed from the mirror.
+
+    Pages are requested by key rather than by page number: each request asks for the instances whose ``field`` is at
+    least the last value received, so instances that change during a sync do not shift the instances that follow
+    them out of view. Every instance must therefore have a value for ``field``. Runs of instances with the same value
+    that do not fit in a page are requested with larger pages, up to the ``maximum`` of ``per_page`` in the link
+    schema, and then page by page.
+
+    The watermark is stored after every page, together with the URIs of the instances received with that value, so
+    that an interrupted sync resumes where it stopped, even within a run of instances with the same value.
+
+    A mirror is a mapping of URIs to :class:`Resource` instances, which are decoded when they are accessed.
+
+    :param resource: a :class:`Resource` class
+    :param str field: a property that increases whenever an instance changes, such as ``'updated_at'``
+    :param store: a mutable mapping, such as a :mod:`shelve`; defaults to a dict
+    :param dict where: an additional condition for the instances to mirror
+    :param int per_page: the number of items per request
+    """
+    WATERMARK_KEY = '$watermark'
+    SEEN_KEY = '$seen'
+
+    def __init__(self, resource, field, store=None, where=None, per_page=100):
+        self.resource = resource
+        self.field = field
+        self.store = store if store is not None else {}
+        self.where = where or {}
+        self.per_page = per_page
+
+    @property
+    def watermark(self):
+        return self.store.get(self.WATERMARK_KEY)
+
+    def sync(self):
+        """
+        Fetches all instances that have changed since the last sync.
+
+        :return: the number of instances that were added or updated
+        """
+        binding = self.resource._links['instances'].__get__(None, self.resource)
+        watermark = self.watermark
+
+        # URIs of the instances received with the current watermark, which the next "$gte" query returns again;
+        # they are only kept in the store while a sync is incomplete.
+        seen = set(self.store.get(self.SEEN_KEY, ()))
+
+        if watermark is None:
+            where = dict(self.where)
+        elif seen:
+            where = self._where("$gte", watermark)
+        else:
+            where = self._where("$gt", watermark)
+
+        try:
+            maximum = binding.link.schema['properties']['per_page'].get('maximum')
+        except KeyError:
+            maximum = None
+
+        initial_per_page = self.per_page if maximum is None else min(self.per_page, maximum)
+        per_page, page = initial_per_page, 1
+        count = 0
+        while True:
+            params = {'where': where, 'sort': {self.field: False}, 'page': page, 'per_page': per_page}
+            response, items = binding.make_request(None, params, decode=False)
+            items = items or []
+
+            for item in items:
+                if item['$uri'] in seen:
+                    continue
+
+                value = item.get(self.field)
+                if value is None:
+                    raise ValueError("Instance '{}' has no value for '{}'".format(item['$uri'], self.field))
+
+                self.store[item['$uri']] = item
+                count += 1
+
+                if watermark is None or _sort_key(value) > _sort_key(watermark):
+                    watermark = value
+                    seen = set()
+                seen.add(item['$uri'])
+
+            # NOTE the watermark and the instances seen with it are stored with every page so that an interrupted
+            # sync can be resumed.
+            if watermark is not None:
+                self.store[self.WATERMARK_KEY] = watermark
+                self.store[self.SEEN_KEY] = sorted(seen)
+
+            if len(items) < per_page:
+                break
+
+            if where.get(self.field) == self._condition("$gte", watermark):
+                # a full page of instances that all have the same value: ask for more of them at once, or once pages
+                # are as large as the server allows, for the next page of them
+                if maximum is None or per_page < maximum:
+                    per_page = per_page * 2 if maximum is None else min(per_page * 2, maximum)
+                    page = 1
+                else:
+                    page += 1
+            else:
+                per_page, page = initial_per_page, 1
+            where = self._where("$gte", watermark)
+
+        if self.SEEN_KEY in self.store:
+            del self.store[self.SEEN_KEY]
+        if hasattr(self.store, 'sync'):
+            self.store.sync()
+        return count
+
+    def _condition(self, operator, value):
+        # merges the condition of the mirror with a condition given for the same property in ``where``
+        condition = self.where.get(self.field)
+        if condition is None:
+            return {operator: value}
+        if not (isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition)) \
+                or '$ref' in condition or '$date' in condition:
+            condition = {"$eq": condition}
+
+        condition = dict(condition)
+        other = condition.get(operator)
+        if other is None or _sort_key(value) > _sort_key(other):
+            condition[operator] = value
+        return condition
+
+    def _where(self, operator, value):
+        where = dict(self.where)
+        where[self.field] = self._condition(operator, value)
+        return where
+
+    def raw(self, uri):
+        """
+        :return: the instance with the given URI as parsed from JSON
+        """
+        if uri in (self.WATERMARK_KEY, self.SEEN_KEY):
+            raise KeyError(uri)
+        return self.store[uri]
+
+    def __getitem__(self, uri):
+        return PotionJSONDecoder(client=self.resource._client).convert(self.raw(uri))
+
+    def __iter__(self):
+        return (uri for uri in self.store if uri not in (self.WATERMARK_KEY, self.SEEN_KEY))
+
+    def __len__(self):
+        return len(self.store) - len([key for key in (self.WATERMARK_KEY, self.SEEN_KEY) if key in self.store])
+
+    def __repr__(self):
+        return 'Mirror({}, {}, watermark={})'.format(self.resource.__name__, repr(self.field), repr(self.watermark))
+
+
+def _sort_key(value):
+    if isinstance(value, dict) and '$date' in value:
+        return value['$date']
+    return value
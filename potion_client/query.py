@@ -0,0 +1,318 @@
+"""
+Evaluates Potion ``where`` and ``sort`` queries on items that have already been fetched.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+import collections
+
+import six
+
+from potion_client.converter import PotionJSONEncoder
+from potion_client.exceptions import ItemNotFound, MultipleItemsFound
+from potion_client.resource import Reference
+
+_encoder = PotionJSONEncoder()
+
+_SCALAR_TYPES = six.string_types + six.integer_types + (float, bool, type(None))
+
+
+def normalize(value):
+    """
+    Converts a value to the form it is compared in: references become their URI and dates become their
+    ``$date`` timestamp. Both decoded values, such as :class:`Resource` instances and :class:`datetime` objects, and
+    their Potion JSON representation, such as ``{"$ref": "/user/1"}``, are accepted.
+    """
+    if isinstance(value, _SCALAR_TYPES):
+        return value
+    if isinstance(value, (Reference, date)):
+        value = _encoder.convert(value)
+    if isinstance(value, dict):
+        if len(value) == 1:
+            if '$ref' in value:
+                return value['$ref']
+            if '$date' in value:
+                return value['$date']
+        return {k: normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    return value
+
+
+def _compare(compare):
+    def operator(value, other):
+        if value is None or other is None:
+            return False
+        try:
+            return compare(value, other)
+        except TypeError:
+            return False
+    return operator
+
+
+def _string(compare):
+    def operator(value, other):
+        return isinstance(value, six.string_types) and isinstance(other, six.string_types) and compare(value, other)
+    return operator
+
+
+def _contains(value, other):
+    if isinstance(value, six.string_types):
+        return isinstance(other, six.string_types) and other in value
+    return isinstance(value, list) and other in value
+
+
+OPERATORS = {
+    '$eq': lambda value, other: value == other,
+    '$ne': lambda value, other: value != other,
+    '$lt': _compare(lambda value, other: value < other),
+    '$lte': _compare(lambda value, other: value <= other),
+    '$gt': _compare(lambda value, other: value > other),
+    '$gte': _compare(lambda value, other: value >= other),
+    '$between': _compare(lambda value, other: other[0] <= value <= other[1]),
+    '$in': lambda value, other: value in other,
+    '$contains': _contains,
+    '$icontains': _string(lambda value, other: other.lower() in value.lower()),
+    '$startswith': _string(lambda value, other: value.startswith(other)),
+    '$istartswith': _string(lambda value, other: value.lower().startswith(other.lower())),
+    '$endswith': _string(lambda value, other: value.endswith(other)),
+    '$iendswith': _string(lambda value, other: value.lower().endswith(other.lower())),
+}
+
+
+def parse_where(where):
+    """
+    :param dict where: a Potion ``where`` query, e.g. ``{"name": "foo", "age": {"$gt": 18}}``
+    :return: a list of ``(property, operator, normalized value)`` conditions
+    """
+    conditions = []
+    for name, condition in (where or {}).items():
+        if isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition) \
+                and not ('$ref' in condition or '$date' in condition):
+            for key, other in condition.items():
+                if key not in OPERATORS:
+                    raise ValueError("Unknown operator '{}' for property '{}'".format(key, name))
+                conditions.append((name, key, normalize(other)))
+        else:
+            conditions.append((name, '$eq', normalize(condition)))
+    return conditions
+
+
+def matches(item, where):
+    """
+    :param item: a :class:`Resource` instance or an item as parsed from JSON
+    :param dict where: a Potion ``where`` query
+    :return: whether the item matches the query
+    """
+    return _matches(item, parse_where(where))
+
+
+def _matches(item, conditions):
+    for name, operator, other in conditions:
+        if not OPERATORS[operator](normalize(item.get(name)), other):
+            return False
+    return True
+
+
+def sort_items(items, sort):
+    """
+    Sorts items in place by a Potion ``sort`` query, e.g. ``{"name": False, "age": True}`` where True means
+    descending. Items without a value come first in ascending order.
+    """
+    for name, descending in reversed(list((sort or {}).items())):
+        items.sort(key=lambda item: _sort_key(normalize(item.get(name))), reverse=descending)
+    return items
+
+
+def _sort_key(value):
+    return (value is not None, value)
+
+
+class HashIndex(object):
+    """
+    An index for ``$eq`` and ``$in`` conditions on a property.
+    """
+    operators = ('$eq', '$in')
+
+    def __init__(self, name):
+        self.name = name
+        self._positions = collections.defaultdict(list)
+
+    def add(self, value, position):
+        try:
+            self._positions[value].append(position)
+        except TypeError:
+            pass  # lists and objects are only matched by scanning
+
+    def lookup(self, operator, other):
+        try:
+            if operator == '$eq':
+                return self._positions.get(other, [])
+            return [position for value in other for position in self._positions.get(value, [])]
+        except TypeError:
+            return None
+
+
+class SortedIndex(object):
+    """
+    An index for ``$eq``, ``$lt``, ``$lte``, ``$gt``, ``$gte``, ``$between`` and ``$startswith`` conditions on a
+    property. Items without a value for the property are not indexed.
+    """
+    operators = ('$eq', '$lt', '$lte', '$gt', '$gte', '$between', '$startswith')
+
+    def __init__(self, name):
+        self.name = name
+        self._entries = []
+
+    def add(self, value, position):
+        if value is None or isinstance(value, (dict, list)):
+            return
+        try:
+            insort(self._entries, (value, position))
+        except TypeError:
+            raise ValueError("Cannot index values of different types for property '{}'".format(self.name))
+
+    def _range(self, low=None, high=None, include_low=True, include_high=True):
+        entries = self._entries
+        start, end = 0, len(entries)
+        # positions are never negative, so (value, -1) and (value, inf) are before and after all entries of a value
+        if low is not None:
+            start = bisect_left(entries, (low, -1) if include_low else (low, float('inf')))
+        if high is not None:
+            end = bisect_right(entries, (high, float('inf')) if include_high else (high, -1))
+        return [position for value, position in entries[start:end]]
+
+    def lookup(self, operator, other):
+        if other is None:
+            return None
+
+        try:
+            if operator == '$eq':
+                return self._range(other, other)
+            if operator == '$lt':
+                return self._range(high=other, include_high=False)
+            if operator == '$lte':
+                return self._range(high=other)
+            if operator == '$gt':
+                return self._range(low=other, include_low=False)
+            if operator == '$gte':
+                return self._range(low=other)
+            if operator == '$between':
+                return self._range(other[0], other[1])
+            if operator == '$startswith':
+                if not isinstance(other, six.string_types):
+                    return []
+                return self._prefix(other)
+        except TypeError:
+            return None
+        return None
+
+    def _prefix(self, prefix):
+        start = bisect_left(self._entries, (prefix, -1))
+        positions = []
+        for value, position in self._entries[start:]:
+            if not (isinstance(value, six.string_types) and value.startswith(prefix)):
+                break
+            positions.append(position)
+        return positions
+
+
+class LocalCollection(object):
+    """
+    A collection of items that have already been fetched, for instance from a :class:`PaginatedList`, that can be
+    queried with the same ``where`` and ``sort`` syntax as the ``instances`` link of a resource, without sending any
+    requests::
+
+        users = LocalCollection(User.instances(per_page=100), indexes={'name': 'hash', 'age': 'sorted'})
+        adults = users.instances(where={'age': {'$gte': 18}}, sort={'name': False})
+
+    A hash index answers ``$eq`` and ``$in`` conditions on a property in constant time; a sorted index answers
+    equality, range and prefix conditions in logarithmic time. Other conditions are checked on the items selected
+    by an index, or on all items if no index applies. Indexes are not updated when the items change.
+
+    :param items: an iterable of :class:`Resource` instances or of items as parsed from JSON
+    :param dict indexes: a mapping of property names to ``'hash'`` or ``'sorted'``
+    """
+    INDEX_TYPES = {'hash': HashIndex, 'sorted': SortedIndex}
+
+    def __init__(self, items=(), indexes=None):
+        self._items = []
+        self._indexes = {}
+        for name, kind in (indexes or {}).items():
+            self.create_index(name, kind)
+        self.extend(items)
+
+    def create_index(self, name, kind='hash'):
+        """
+        Indexes a property of the items.
+
+        :param str name: the property
+        :param str kind: ``'hash'`` or ``'sorted'``
+        """
+        try:
+            index = self.INDEX_TYPES[kind](name)
+        except KeyError:
+            raise ValueError("Unknown index type '{}'; expected one of: {}".format(kind, ', '.join(self.INDEX_TYPES)))
+
+        for position, item in enumerate(self._items):
+            index.add(normalize(item.get(name)), position)
+        self._indexes.setdefault(name, []).append(index)
+
+    def add(self, item):
+        position = len(self._items)
+        self._items.append(item)
+        for name, indexes in self._indexes.items():
+            value = normalize(item.get(name))
+            for index in indexes:
+                index.add(value, position)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def _candidates(self, conditions):
+        best = None
+        for name, operator, other in conditions:
+            for index in self._indexes.get(name, ()):
+                if operator in index.operators:
+                    positions = index.lookup(operator, other)
+                    if positions is not None and (best is None or len(positions) < len(best)):
+                        best = positions
+        if best is None:
+            return self._items
+        return [self._items[position] for position in sorted(set(best))]
+
+    def instances(self, where=None, sort=None):
+        """
+        :param dict where: a Potion ``where`` query
+        :param dict sort: a Potion ``sort`` query
+        :return: a list of the matching items, in the order they were added unless ``sort`` is given
+        """
+        conditions = parse_where(where)
+        results = [item for item in self._candidates(conditions) if _matches(item, conditions)]
+        return sort_items(results, sort)
+
+    def first(self, where=None, sort=None):
+        try:
+            return self.instances(where, sort)[0]
+        except IndexError:
+            raise ItemNotFound("No item found matching: {}".format(repr(where)))
+
+    def one(self, where=None):
+        matching = self.instances(where)
+        if len(matching) > 1:
+            raise MultipleItemsFound("Multiple items found matching: {}".format(repr(where)))
+        try:
+            return matching[0]
+        except IndexError:
+            raise ItemNotFound("No item found matching: {}".format(repr(where)))
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return '{}({} items, indexes={})'.format(self.__class__.__name__,
+                                                  len(self._items),
+                                                  sorted(self._indexes))
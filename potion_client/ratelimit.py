@@ -0,0 +1,214 @@
+from email.utils import parsedate_tz, mktime_tz
+from threading import Condition, Lock
+import random
+import time
+
+from potion_client.exceptions import DeadlineExceeded
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+THROTTLED_STATUS_CODES = (429, 503)
+
+
+class TokenBucket(object):
+    """
+    Limits the rate of requests to ``rate`` requests per second, with bursts of up to ``capacity`` requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    def acquire(self, expires=None):
+        """
+        Blocks until a request may be sent.
+
+        :param float expires: the time by which the request must be sent, or None; :class:`DeadlineExceeded` is
+            raised if it cannot be sent by then
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+
+            if expires is not None and now + wait >= expires:
+                raise DeadlineExceeded('Deadline exceeded while waiting for the rate limit')
+            time.sleep(wait)
+
+    def __repr__(self):
+        return '{}({}, capacity={})'.format(self.__class__.__name__, self.rate, self.capacity)
+
+
+class AIMDLimit(object):
+    """
+    Limits the number of concurrent requests. The limit grows by ``increase`` with every successful response and is
+    multiplied by ``decrease`` whenever the server signals that it is overloaded.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=64, increase=1, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._condition = Condition()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_condition']
+        state['in_flight'] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._condition = Condition()
+
+    def acquire(self, expires=None):
+        """
+        Blocks until a request may be sent.
+
+        :param float expires: the time by which the request must be sent, or None; :class:`DeadlineExceeded` is
+            raised if it cannot be sent by then
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                if expires is None:
+                    self._condition.wait()
+                    continue
+
+                remaining = expires - time.time()
+                if remaining <= 0:
+                    raise DeadlineExceeded('Deadline exceeded while waiting for the concurrency limit')
+                self._condition.wait(remaining)
+            self.in_flight += 1
+
+    def release(self, throttled=False):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            else:
+                # additive increase of ``increase`` per window of ``limit`` requests
+                self.limit = min(self.maximum, self.limit + float(self.increase) / self.limit)
+            self._condition.notify_all()
+
+    def __repr__(self):
+        return '{}(limit={}, in_flight={})'.format(self.__class__.__name__, int(self.limit), self.in_flight)
+
+
+class AdmissionControl(object):
+    """
+    Controls the rate and concurrency of the requests sent by a :class:`Client` or a :class:`Link`.
+
+    Idempotent requests that are answered with ``429 Too Many Requests`` or ``503 Service Unavailable`` are retried
+    after the delay in the ``Retry-After`` header, or otherwise after an exponential backoff with full jitter. When both
+    a client and a link have a controller, only the controller of the link retries requests.
+
+    :param float rate: the maximum number of requests per second, or None
+    :param int burst: the maximum number of requests sent at once when below the rate
+    :param concurrency: the initial maximum number of concurrent requests, an :class:`AIMDLimit`, or None
+    :param int retries: the maximum number of retries of a throttled request
+    :param float backoff: the backoff in seconds before the first retry
+    :param float max_backoff: the maximum delay in seconds before a retry
+    """
+
+    def __init__(self, rate=None, burst=None, concurrency=None, retries=3, backoff=0.5, max_backoff=60):
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+
+        if isinstance(concurrency, int):
+            concurrency = AIMDLimit(initial=concurrency)
+        self.limit = concurrency
+
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def retry_delay(self, response, attempt):
+        """
+        :return: the delay in seconds before retrying a throttled request
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                date = parsedate_tz(retry_after)
+                if date is not None:
+                    return min(self.max_backoff, max(0.0, mktime_tz(date) - time.time()))
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def admit(self, send, request, expires=None, **kwargs):
+        """
+        Sends a request once it is admitted by the rate and concurrency limits, without retrying it.
+
+        :param callable send: a function that sends a prepared request and returns the response,
+            e.g. :meth:`requests.Session.send`
+        :param requests.PreparedRequest request:
+        :param float expires: the time by which the request must be sent, or None; :class:`DeadlineExceeded` is
+            raised if it is not admitted by then
+        """
+        if self.bucket is not None:
+            self.bucket.acquire(expires)
+        if self.limit is not None:
+            self.limit.acquire(expires)
+
+        try:
+            response = send(request, **kwargs)
+        except Exception:
+            if self.limit is not None:
+                self.limit.release()
+            raise
+
+        if self.limit is not None:
+            self.limit.release(response.status_code in THROTTLED_STATUS_CODES)
+        return response
+
+    def send(self, send, request, expires=None, **kwargs):
+        """
+        Sends a request through :meth:`admit` and retries it while it is throttled.
+
+        :param callable send: a function that sends a prepared request and returns the response,
+            e.g. :meth:`requests.Session.send`
+        :param requests.PreparedRequest request:
+        :param float expires: the time by which the request must be sent, or None; :class:`DeadlineExceeded` is
+            raised instead of waiting for a retry that would start later
+        """
+        attempt = 0
+        while True:
+            response = self.admit(send, request, expires=expires, **kwargs)
+
+            throttled = response.status_code in THROTTLED_STATUS_CODES
+            if not throttled or request.method not in IDEMPOTENT_METHODS or attempt >= self.retries:
+                return response
+
+            response.close()
+            delay = self.retry_delay(response, attempt)
+            if expires is not None and time.time() + delay >= expires:
+                raise DeadlineExceeded('Deadline exceeded before retrying {} {}'.format(request.method, request.url))
+            time.sleep(delay)
+            attempt += 1
+
+    def __repr__(self):
+        return '{}(bucket={}, limit={}, retries={})'.format(self.__class__.__name__,
+                                                           self.bucket,
+                                                           self.limit,
+                                                           self.retries)
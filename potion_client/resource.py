@@ -1,5 +1,6 @@
-import collections
 from pprint import pformat
+from threading import RLock
+import collections
 
 import six
 
@@ -17,6 +18,34 @@ def uri_for(reference):
     return reference._uri
 
 
+class ResourceProperty(object):
+    # A descriptor for a property of a resource, e.g. ``User.name`` for ``user['name']``.
+    __slots__ = ('name', 'read_only', '__doc__')
+
+    def __init__(self, name, read_only=False, doc=None):
+        self.name = name
+        self.read_only = read_only
+        self.__doc__ = doc
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance[self.name]
+
+    def __set__(self, instance, value):
+        if self.read_only:
+            raise AttributeError("Property '{}' of '{}' is read-only".format(self.name, type(instance).__name__))
+        instance[self.name] = value
+
+    def __delete__(self, instance):
+        if self.read_only:
+            raise AttributeError("Property '{}' of '{}' is read-only".format(self.name, type(instance).__name__))
+        del instance[self.name]
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, repr(self.name))
+
+
 class Reference(collections.Mapping):
     """
 
@@ -29,6 +58,7 @@ class Reference(collections.Mapping):
     def __init__(self, uri, client=None):
         self._status = None
         self._uri = uri
+        self._lock = RLock()
         self.__properties = {'$uri': uri}
         if client is not None:
             self._client = client
@@ -40,8 +70,11 @@ class Reference(collections.Mapping):
     @property
     def _properties(self):
         if self._uri and self._status is None:
-            self.__properties = self._resolve(self._client, self._uri)
-            self._status = 200
+            # NOTE threads resolving the same reference wait for a single request.
+            with self._lock:
+                if self._status is None:
+                    self.__properties = self._resolve(self._client, self._uri)
+                    self._status = 200
         return self.__properties
 
     @_properties.setter
@@ -49,6 +82,27 @@ class Reference(collections.Mapping):
         self.__properties = value
         self._status = 200
 
+    def _resolve_with(self, properties):
+        # Properties that are only set locally are kept. The merged properties are assigned before the reference is
+        # marked as resolved, so that threads reading it without the lock never see it resolved but incomplete.
+        with self._lock:
+            for k, v in self.__properties.items():
+                if k not in properties:
+                    properties[k] = v
+            self._properties = properties
+
+    def __reduce__(self):
+        return _restore_reference, (self.__class__, self._client, self._uri), self._loaded_properties()
+
+    def __setstate__(self, state):
+        if state is not None and self._status is None:
+            self._properties = state
+
+    def _loaded_properties(self):
+        if self._status is None:
+            return None
+        return dict(self.__properties)
+
     def __contains__(self, item):
         return item in self._properties
 
@@ -66,36 +120,53 @@ class Reference(collections.Mapping):
                                      uri=repr(self._uri))
 
 
+def _restore_reference(cls, client, uri):
+    if client is None:
+        return cls(uri)
+    return client.instance(uri, cls=cls, client=client)
+
+
+def _restore_resource(client, name, uri):
+    cls = client._resource_classes[name]
+    if uri is None:
+        return cls()
+    return cls(uri)
+
+
 class Resource(Reference):
     _client = None
+    _name = None
     _links = None
     _self = None
     _instances = None
     _create = None
     _destroy = None
     _update = None
+    _cache = False
 
     def __new__(cls, uri=None, **kwargs):
-        instance = None
-        if uri is not None:
-            if not (isinstance(uri, six.string_types) and uri.startswith('/')) and cls._self is not None:
-                uri = cls._self.href.format(id=uri)
-
-            instances = cls._client._instances
-            instance = instances.get(uri, None)
-
-        if instance is None:
-            instance = super(Resource, cls).__new__(cls)
-            super(Resource, instance).__init__(uri)
-            instance._properties = {'$uri': uri}
-            if not kwargs:
-                instance._status = None
-            else:
-                instance._status = 200
-                instance._properties.update(kwargs)
+        if uri is not None and not (isinstance(uri, six.string_types) and uri.startswith('/')) \
+                and cls._self is not None:
+            uri = cls._self.href.format(id=uri)
 
+        with cls._client._lock:
+            instance = None
             if uri is not None:
-                instances[uri] = instance
+                instances = cls._client._instances
+                instance = instances.get(uri, None)
+
+            if instance is None:
+                instance = super(Resource, cls).__new__(cls)
+                super(Resource, instance).__init__(uri)
+                instance._properties = {'$uri': uri}
+                if not kwargs:
+                    instance._status = None
+                else:
+                    instance._status = 200
+                    instance._properties.update(kwargs)
+
+                if uri is not None:
+                    instances[uri] = instance
 
         # NOTE ensures that there is a single instance of a Resource with a given URL unless one creates an item
         # without URL and creates an item with the URL the first item is going to have, before saving the first item.
@@ -104,6 +175,10 @@ class Resource(Reference):
     def __init__(self, uri=None, **kwargs):
         pass  # Must be blank. See __new__()
 
+    def __reduce__(self):
+        # Resource classes are created at runtime and are looked up by name in the client of the receiving process.
+        return _restore_resource, (self._client, self._name, self._uri), self._loaded_properties()
+
     @property
     def id(self):
         if self._uri is not None:
@@ -113,10 +188,13 @@ class Resource(Reference):
             return id_
         return None
 
-    # TODO cache this property
     @property
     def _validator(self):
-        return None
+        # the validator of the link save() sends the instance with
+        link = self._create if self._uri is None else self._update
+        if link is None:
+            return None
+        return link.validator
 
     def __delitem__(self, item):
         del self._properties[item]
@@ -149,6 +227,17 @@ class Resource(Reference):
     def fetch(cls, id):
         return cls._self(id=id)
 
+    @classmethod
+    def fetch_many(cls, ids, concurrency=8):
+        """
+        Fetches many instances concurrently. See :meth:`Client.fetch_many`.
+
+        :param list ids: a list of ids or URIs
+        :param int concurrency: the maximum number of requests in flight
+        :return: a list with the instance for each id, in order, or the exception raised while fetching it
+        """
+        return cls._client._resolve_many([cls(id) for id in ids], concurrency)
+
     def check(self):
         pass
 
@@ -158,11 +247,19 @@ class Resource(Reference):
 
         if self._uri is None:
             return self._create(**self)
-        else:
+
+        uri = self._uri
+        try:
             return self._update(**self)
+        finally:
+            self._client._invalidate(uri)
 
     def delete(self):
-        return self._destroy(id=self.id)
+        uri = self._uri
+        try:
+            return self._destroy(id=self.id)
+        finally:
+            self._client._invalidate(uri)
 
     def _repr_html_(self):
         return '''<table>
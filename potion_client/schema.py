@@ -7,6 +7,7 @@ class Schema(collections.Mapping):
         if isinstance(schema, Schema):
             schema = schema._schema
         self._schema = schema or {}
+        self._admission = {}
 
     @property
     def type(self):
@@ -40,6 +41,13 @@ class Schema(collections.Mapping):
         return tuple(self._schema.get('required', []))
 
     def can_include_property(self, name):
+        try:
+            return self._admission[name]
+        except KeyError:
+            admitted = self._admission[name] = self._can_include_property(name)
+            return admitted
+
+    def _can_include_property(self, name):
         # empty schema "{}" allows all properties
         if not self._schema:
             return True
@@ -59,7 +67,7 @@ class Schema(collections.Mapping):
             if self._schema.get('additionalProperties', True):
                 return True
 
-            for pattern in self._schema.get('patternProperties', {}).values():
+            for pattern in self._schema.get('patternProperties', {}):
                 if re.match(pattern, name):
                     return True
 
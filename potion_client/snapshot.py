@@ -0,0 +1,169 @@
+"""
+Local snapshot files of Potion items.
+
+A snapshot file consists of a header, one record for each item (the length of the item in bytes followed by the
+item as JSON), an index of the record offsets, a JSON object that maps the ``$uri`` of each item to its position,
+and a footer. Snapshots are opened as memory-mapped, read-only sequences that decode items only when they are
+accessed.
+"""
+import collections
+import json
+import mmap
+import os
+import struct
+
+from potion_client.collection import PaginatedList
+from potion_client.resource import Reference
+
+MAGIC = b'PTNSNAP1'
+
+_LENGTH = struct.Struct('<I')
+_OFFSET = struct.Struct('<Q')
+_FOOTER = struct.Struct('<QQQ8s')
+
+
+def write_snapshot(path, items, client=None):
+    """
+    Writes items to a snapshot file. The pages of a :class:`PaginatedList` are written as they are received,
+    without creating :class:`Resource` instances.
+
+    :param str path: the path of the snapshot file
+    :param items: a :class:`PaginatedList`, or an iterable of resource instances or of items as parsed from JSON
+    :param Client client: the client used to encode items; defaults to the client of a :class:`PaginatedList`
+    :return: the number of items written
+    """
+    if client is None and isinstance(items, PaginatedList):
+        client = items._binding.owner._client
+
+    if isinstance(items, PaginatedList):
+        items = (item for page in items.raw_pages() for item in page)
+
+    dumps = client._json.dumps if client is not None else json.dumps
+    offsets = []
+    keys = {}
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+
+        for item in items:
+            if isinstance(item, Reference):
+                item = item._client._encoder.convert(dict(item._properties))
+
+            uri = item.get('$uri') if isinstance(item, dict) else None
+            if uri is not None:
+                keys[uri] = len(offsets)
+
+            data = dumps(item)
+            if not isinstance(data, bytes):
+                data = data.encode('utf-8')
+
+            offsets.append(f.tell())
+            f.write(_LENGTH.pack(len(data)))
+            f.write(data)
+
+        index_offset = f.tell()
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+
+        keys_offset = f.tell()
+        f.write(json.dumps(keys).encode('utf-8'))
+        f.write(_FOOTER.pack(len(offsets), index_offset, keys_offset, MAGIC))
+
+    return len(offsets)
+
+
+class Snapshot(collections.Sequence):
+    """
+    A read-only sequence over the items of a snapshot file. The file is memory-mapped, so a snapshot can be opened
+    by many processes at once at little cost.
+
+    :param str path: the path of the snapshot file
+    :param Client client: the client used to decode items into Potion objects; if None, items are returned as
+        parsed from JSON
+    """
+
+    def __init__(self, path, client=None):
+        self._client = client
+        self._file = open(path, 'rb')
+        self._mmap = None
+        self._keys = None
+
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < len(MAGIC) + _FOOTER.size:
+                raise ValueError("'{}' is not a snapshot file".format(path))
+
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            count, index_offset, keys_offset, magic = _FOOTER.unpack_from(self._mmap, size - _FOOTER.size)
+            if magic != MAGIC or self._mmap[:len(MAGIC)] != MAGIC or \
+                    not len(MAGIC) <= index_offset <= keys_offset <= size - _FOOTER.size or \
+                    index_offset + count * _OFFSET.size != keys_offset:
+                raise ValueError("'{}' is not a snapshot file".format(path))
+        except Exception:
+            self.close()
+            raise
+
+        self._count = count
+        self._index_offset = index_offset
+        self._keys_offset = keys_offset
+
+    def _record(self, index):
+        offset, = _OFFSET.unpack_from(self._mmap, self._index_offset + index * _OFFSET.size)
+        length, = _LENGTH.unpack_from(self._mmap, offset)
+        start = offset + _LENGTH.size
+        return self._mmap[start:start + length]
+
+    def raw(self, index):
+        """
+        :return: the item at the given position as parsed from JSON, without Potion conversions
+        """
+        if self._client is not None:
+            return self._client._json.loads(self._record(self._check_index(index)))
+        return json.loads(self._record(self._check_index(index)).decode('utf-8'))
+
+    def _check_index(self, index):
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError()
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if self._client is None:
+            return self.raw(index)
+        return self._client._decode(self._record(self._check_index(index)))
+
+    def __len__(self):
+        return self._count
+
+    def index_of(self, uri):
+        """
+        :return: the position of the item with the given ``$uri``
+        :raises KeyError: if there is no item with that URI
+        """
+        if self._keys is None:
+            self._keys = json.loads(self._mmap[self._keys_offset:len(self._mmap) - _FOOTER.size].decode('utf-8'))
+        return self._keys[uri]
+
+    def get(self, uri, default=None):
+        try:
+            return self[self.index_of(uri)]
+        except KeyError:
+            return default
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return 'Snapshot({}, {} items)'.format(repr(self._file.name), self._count)
@@ -0,0 +1,75 @@
+"""
+Incremental parsing of JSON arrays from a response body that arrives in chunks.
+"""
+import re
+
+_STRUCTURAL = re.compile(br'[\[\]{},"]')
+_STRING = re.compile(br'["\\]')
+
+
+def iter_json_array(chunks):
+    """
+    Splits a JSON array into the raw JSON of its elements as the chunks of the array arrive. Only the current
+    element is held in memory. The elements are not validated; they need to be parsed by a JSON backend.
+
+    :param chunks: an iterable of :class:`bytes`, such as :meth:`requests.Response.iter_content`
+    :return: an iterator over the raw JSON of each element, as :class:`bytes`
+    :raises ValueError: if the document is not a JSON array
+    """
+    buffer = b''
+    position = start = depth = 0
+    started = in_string = False
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+
+        while True:
+            if in_string:
+                match = _STRING.search(buffer, position)
+                if match is None:
+                    position = max(position, len(buffer))
+                    break
+                if match.group() == b'\\':
+                    # NOTE the escaped character may be in the next chunk; the next search starts after it.
+                    position = match.end() + 1
+                else:
+                    position = match.end()
+                    in_string = False
+                continue
+
+            match = _STRUCTURAL.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+
+            token, position = match.group(), match.end()
+
+            if not started:
+                if token != b'[' or buffer[:match.start()].strip():
+                    raise ValueError('Response is not a JSON array')
+                started = True
+                start = position
+            elif token == b'"':
+                in_string = True
+            elif token in (b'[', b'{'):
+                depth += 1
+            elif token in (b']', b'}'):
+                if depth == 0:
+                    element = buffer[start:match.start()].strip()
+                    if element:
+                        yield element
+                    return
+                depth -= 1
+            elif depth == 0:
+                yield buffer[start:match.start()].strip()
+                start = position
+
+        # discard the elements that have been yielded
+        if start:
+            buffer = buffer[start:]
+            position -= start
+            start = 0
+
+    raise ValueError('Unexpected end of JSON array')
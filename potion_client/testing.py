@@ -0,0 +1,309 @@
+"""
+An in-process stand-in for a Flask-Potion API, for testing and load-testing clients without a network.
+"""
+from threading import Lock
+import json
+import random
+import re
+import time
+import zlib
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import ReadTimeout
+from requests.models import Response
+from six.moves.urllib.parse import urlparse, parse_qs
+import six
+
+from potion_client.query import matches, sort_items
+
+
+def default_links(route):
+    """
+    :param str route: the path of a resource, e.g. ``'/api/user'``
+    :return: the links of a resource with the default Potion routes
+    """
+    return [
+        {"rel": "self", "href": route + "/{id}", "method": "GET", "targetSchema": {"$ref": "#"}},
+        {"rel": "instances", "href": route, "method": "GET", "schema": {
+            "type": "object",
+            "properties": {
+                "where": {"type": "object"},
+                "sort": {"type": "object"},
+                "page": {"type": "integer", "default": 1, "minimum": 1},
+                "per_page": {"type": "integer", "default": 20, "minimum": 1, "maximum": 100}
+            }
+        }},
+        {"rel": "create", "href": route, "method": "POST", "schema": {"$ref": "#"}},
+        {"rel": "update", "href": route + "/{id}", "method": "PATCH", "schema": {"$ref": "#"}},
+        {"rel": "destroy", "href": route + "/{id}", "method": "DELETE"}
+    ]
+
+
+class FakePotionServer(BaseAdapter):
+    """
+    A transport adapter for :mod:`requests` that serves a Potion API generated from resource schemas, with
+    synthetic instances.
+
+    The server serves ``/schema``, the schema of each resource, the ``self``, ``instances``, ``create``, ``update``
+    and ``destroy`` links, and echoes the request data for any other link. ``instances`` supports ``page``,
+    ``per_page``, ``sort`` and simple ``where`` conditions, and returns an ``X-Total-Count`` header. Like Potion, it
+    answers ``400 Bad Request`` if ``page`` is less than 1 or ``per_page`` is greater than the ``maximum`` in the link
+    schema. Resources without links get the default Potion routes.
+
+    Latency, errors and throttling are simulated using a seeded random number generator, so runs are
+    reproducible. Requests that would take longer than their ``timeout`` raise :class:`requests.ReadTimeout`.
+
+    :param dict resources: a mapping of resource names to resource schemas
+    :param str url: the root URL of the API
+    :param dict rows: the number of synthetic instances of each resource; defaults to ``default_rows``
+    :param float latency: the delay in seconds before each response
+    :param float jitter: the maximum random delay in seconds added to ``latency``
+    :param float error_rate: the fraction of requests answered with ``500 Internal Server Error``
+    :param float rate_limit: the number of requests per second after which requests are answered with
+        ``429 Too Many Requests``, or None
+    :param int seed: the seed of the random number generator
+    """
+
+    def __init__(self,
+                 resources,
+                 url='http://potion.test/api',
+                 rows=None,
+                 default_rows=100,
+                 latency=0.0,
+                 jitter=0.0,
+                 error_rate=0.0,
+                 rate_limit=None,
+                 seed=0):
+        super(FakePotionServer, self).__init__()
+        parse_result = urlparse(url)
+        self.url = url
+        self.root_path = parse_result.path
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.requests = []
+
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self._window = (0, 0)
+
+        self.schemas = {}
+        self.data = {}
+        self._routes = []
+        self._max_per_page = {}
+
+        for name, schema in resources.items():
+            route = '{}/{}'.format(self.root_path, name.replace('_', '-'))
+            schema = dict(schema)
+            schema.setdefault('type', 'object')
+            schema.setdefault('properties', {})
+            if not schema.get('links'):
+                schema['links'] = default_links(route)
+
+            self.schemas[name] = schema
+
+            for link in schema['links']:
+                if link['rel'] == 'instances':
+                    per_page = (link.get('schema') or {}).get('properties', {}).get('per_page', {})
+                    self._max_per_page[name] = per_page.get('maximum')
+
+                parts = re.split(r'\{(\w+)\}', link['href'])
+                pattern = ''.join(re.escape(part) if i % 2 == 0 else '(?P<{}>[^/]+)'.format(part)
+                                  for i, part in enumerate(parts))
+                self._routes.append((link['method'], re.compile('^{}$'.format(pattern)), name, link['rel']))
+
+        for name in resources:
+            count = (rows or {}).get(name, default_rows)
+            self.data[name] = {i: self._generate(name, i) for i in range(1, count + 1)}
+
+    def _uri(self, name, id):
+        return '{}/{}/{}'.format(self.root_path, name.replace('_', '-'), id)
+
+    def _generate(self, name, i):
+        item = {"$uri": self._uri(name, i)}
+        for property_name, schema in self.schemas[name]['properties'].items():
+            if property_name.startswith('$'):
+                continue
+            value = self._generate_value(property_name, schema, i)
+            if value is not None:
+                item[property_name] = value
+        return item
+
+    def _generate_value(self, name, schema, i):
+        properties = schema.get('properties', {})
+        if '$date' in properties:
+            return {"$date": 1451606400000 + i * 3600000}
+        if '$ref' in properties:
+            match = re.match(r'^\^?(.*?)\[\^/\]\+\$?$', properties['$ref'].get('pattern', ''))
+            if match:
+                return {"$ref": match.group(1).replace('\\/', '/') + str(i)}
+            return None
+
+        types = schema.get('type', ())
+        if isinstance(types, six.string_types):
+            types = (types,)
+
+        if 'integer' in types:
+            return i
+        if 'number' in types:
+            return i * 1.5
+        if 'boolean' in types:
+            return i % 2 == 0
+        if 'string' in types:
+            return '{}-{}'.format(name, i)
+        return None
+
+    def _response(self, request, status_code, body=None, headers=None):
+        response = Response()
+        response.status_code = status_code
+        response.headers.update(headers or {})
+        if body is not None or status_code != 204:
+            response.headers['Content-Type'] = 'application/json'
+            response._content = json.dumps(body).encode('utf-8')
+        else:
+            response._content = b''
+        response.encoding = 'utf-8'
+        response.request = request
+        response.connection = self
+        response.url = request.url
+        response.reason = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+                           429: 'Too Many Requests', 500: 'Internal Server Error'}.get(status_code, '')
+        return response
+
+    def _throttled(self):
+        if self.rate_limit is None:
+            return False
+        second = int(time.time())
+        with self._lock:
+            window, count = self._window
+            if window != second:
+                window, count = second, 0
+            self._window = (window, count + 1)
+        return count >= self.rate_limit
+
+    def send(self, request, timeout=None, **kwargs):
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate and self._random.random() < self.error_rate
+            self.requests.append((request.method, request.url))
+
+        if isinstance(timeout, tuple):
+            timeout = timeout[1]
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise ReadTimeout('Read timed out. (read timeout={})'.format(timeout), request=request)
+
+        if delay:
+            time.sleep(delay)
+
+        if self._throttled():
+            return self._response(request, 429, {"status": 429, "message": "Too Many Requests"}, {'Retry-After': '1'})
+        if failed:
+            return self._response(request, 500, {"status": 500, "message": "Internal Server Error"})
+
+        parse_result = urlparse(request.url)
+        path = parse_result.path
+        params = {k: v[0] for k, v in parse_qs(parse_result.query).items()}
+
+        if path == self.root_path + '/schema':
+            return self._response(request, 200, {
+                "properties": {name: {"$ref": "{}/{}/schema#".format(self.root_path, name.replace('_', '-'))}
+                               for name in self.schemas}
+            })
+
+        for name in self.schemas:
+            if path == '{}/{}/schema'.format(self.root_path, name.replace('_', '-')):
+                return self._response(request, 200, self.schemas[name])
+
+        for method, pattern, name, rel in self._routes:
+            match = pattern.match(path)
+            if method == request.method and match:
+                with self._lock:
+                    return self._handle(request, name, rel, match.groupdict(), params)
+
+        return self._response(request, 404, {"status": 404, "message": "Not Found"})
+
+    def _body(self, request):
+        body = request.body
+        if not body:
+            return None
+        encoding = request.headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        return json.loads(body)
+
+    def _handle(self, request, name, rel, path_params, params):
+        items = self.data[name]
+
+        if rel == 'instances':
+            results = list(items.values())
+            if 'where' in params:
+                where = json.loads(params['where'])
+                results = [item for item in results if matches(item, where)]
+            if 'sort' in params:
+                sort_items(results, json.loads(params['sort']))
+
+            page = int(json.loads(params.get('page', '1')))
+            per_page = int(json.loads(params.get('per_page', '20')))
+            maximum = self._max_per_page.get(name)
+            if page < 1 or per_page < 1 or (maximum is not None and per_page > maximum):
+                return self._response(request, 400, {"status": 400, "message": "Bad Request"})
+
+            start = (page - 1) * per_page
+            return self._response(request, 200, results[start:start + per_page], {'X-Total-Count': str(len(results))})
+
+        if rel == 'create':
+            id = max(items) + 1 if items else 1
+            item = dict(self._body(request) or {})
+            item['$uri'] = self._uri(name, id)
+            items[id] = item
+            return self._response(request, 200, item)
+
+        if 'id' in path_params:
+            try:
+                id = int(path_params['id'])
+            except ValueError:
+                id = path_params['id']
+
+            if id not in items:
+                return self._response(request, 404, {"status": 404, "message": "Not Found"})
+
+            if rel == 'self':
+                return self._response(request, 200, items[id])
+            if rel == 'update':
+                items[id].update(self._body(request) or {})
+                return self._response(request, 200, items[id])
+            if rel == 'destroy':
+                del items[id]
+                return self._response(request, 204)
+
+        return self._response(request, 200, self._body(request))
+
+    def mount(self, session):
+        """
+        Mounts this server on a :class:`requests.Session`, so that it handles all requests to its URL.
+        """
+        parse_result = urlparse(self.url)
+        session.mount('{}://{}'.format(parse_result.scheme, parse_result.netloc), self)
+
+    def client(self, **kwargs):
+        """
+        :return: a :class:`Client` connected to this server, with the schema loaded
+        """
+        from potion_client import Client
+
+        client = Client(self.url, fetch_schema=False, **kwargs)
+        self.mount(client.session)
+        client._fetch_schema()
+        return client
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, repr(self.url))
@@ -0,0 +1,65 @@
+from jsonschema import Draft4Validator
+from jsonschema.exceptions import best_match
+
+from potion_client.converter import PotionJSONEncoder
+from potion_client.resource import Reference
+
+_encoder = PotionJSONEncoder()
+
+
+def validator_schema(schema, partial=False):
+    """
+    Converts a schema with resolved references into a plain JSON schema. References to the root of the schema become
+    ``{"$ref": "#"}``; references to other schema documents become ``{}`` and accept anything, so that compiling a
+    validator never fetches another schema.
+
+    :param dict schema: a schema as decoded by :class:`PotionJSONSchemaDecoder`
+    :param bool partial: whether the data is a partial update, in which the ``required`` properties of the root of
+        the schema may be left out
+    """
+    active = set()
+
+    def convert(o):
+        if isinstance(o, Reference):
+            return {}
+        if isinstance(o, dict):
+            if o is schema and active:
+                return {"$ref": "#"}
+            if id(o) in active:
+                return {}
+
+            active.add(id(o))
+            try:
+                return {k: convert(v) for k, v in o.items() if not (partial and o is schema and k == 'required')}
+            finally:
+                active.discard(id(o))
+        if isinstance(o, (list, tuple)):
+            return [convert(v) for v in o]
+        return o
+
+    return convert(schema)
+
+
+def compile_validator(schema, partial=False):
+    """
+    :param dict schema: a schema as decoded by :class:`PotionJSONSchemaDecoder`
+    :param bool partial: whether the data is a partial update; see :func:`validator_schema`
+    :return: a :class:`jsonschema.Draft4Validator` for the schema
+    """
+    return Draft4Validator(validator_schema(schema, partial))
+
+
+def iter_errors(validator, data):
+    """
+    Validates data after converting dates and references to their Potion JSON representation.
+
+    :return: an iterator over the :class:`jsonschema.ValidationError` errors
+    """
+    return validator.iter_errors(_encoder.convert(data))
+
+
+def validation_error(validator, data):
+    """
+    :return: the most relevant :class:`jsonschema.ValidationError` for data, or None if the data is valid
+    """
+    return best_match(iter_errors(validator, data))
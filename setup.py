@@ -18,8 +18,14 @@ setup(
     install_requires=[
         'jsonschema>=2.4',
         'requests>=2.5',
-        'six'
+        'six',
+        'futures; python_version < "3.2"'
     ],
+    entry_points={
+        'console_scripts': [
+            'potion-client = potion_client.cli:main'
+        ]
+    },
     test_suite='nose.collector',
     tests_require=[
         'responses',
@@ -0,0 +1,104 @@
+import pickle
+import time
+from threading import Thread
+from unittest import TestCase
+
+import requests
+import responses
+
+from potion_client.auth import HTTPBearerAuth
+
+
+class HTTPBearerAuthTestCase(TestCase):
+    @responses.activate
+    def test_fixed_token(self):
+        responses.add(responses.GET, 'http://example.com/api/user/1', json={})
+
+        requests.get('http://example.com/api/user/1', auth=HTTPBearerAuth('abc'))
+        self.assertEqual('Bearer abc', responses.calls[0].request.headers['Authorization'])
+
+    @responses.activate
+    def test_retry_once_after_401(self):
+        tokens = iter(['expired', 'valid', 'other'])
+        auth = HTTPBearerAuth(provider=lambda: next(tokens))
+
+        def request_callback(request):
+            if request.headers['Authorization'] == 'Bearer valid':
+                return 200, {}, '{}'
+            return 401, {}, '{"status": 401}'
+
+        responses.add_callback(responses.GET, 'http://example.com/api/user/1', callback=request_callback)
+
+        response = requests.get('http://example.com/api/user/1', auth=auth)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([401], [r.status_code for r in response.history])
+        self.assertEqual('valid', auth.token)
+
+        auth.token = 'revoked'
+        response = requests.get('http://example.com/api/user/1', auth=auth)
+        self.assertEqual(401, response.status_code)
+        self.assertEqual(4, len(responses.calls))
+        self.assertEqual('other', auth.token)
+
+    @responses.activate
+    def test_no_retry_without_new_token(self):
+        tokens = ['expired', 'expired', None]
+        auth = HTTPBearerAuth(provider=lambda: tokens.pop(0))
+        responses.add(responses.GET, 'http://example.com/api/user/1', status=401, json={"status": 401})
+
+        for calls in (1, 2):
+            response = requests.get('http://example.com/api/user/1', auth=auth)
+            self.assertEqual(401, response.status_code)
+            self.assertEqual([], response.history)
+            self.assertEqual(calls, len(responses.calls))
+            self.assertEqual({'status': 401}, response.json())
+
+    def test_single_refresh(self):
+        calls = []
+
+        def provider():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'token-{}'.format(len(calls)), 3600
+
+        auth = HTTPBearerAuth(provider=provider)
+        tokens = []
+        threads = [Thread(target=lambda: tokens.append(auth.get_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(['token-1'] * 8, tokens)
+
+        self.assertEqual('token-1', auth.refresh('token-0'))
+        self.assertEqual(1, len(calls))
+
+    def test_refresh_ahead_of_expiry(self):
+        calls = []
+
+        def provider():
+            calls.append(1)
+            return 'token-{}'.format(len(calls)), 10
+
+        auth = HTTPBearerAuth(provider=provider, refresh_ahead=5)
+        self.assertEqual('token-1', auth.get_token())
+
+        auth.expires_at = time.time() + 2
+        self.assertEqual('token-1', auth.get_token())
+
+        for _ in range(100):
+            if auth.token == 'token-2':
+                break
+            time.sleep(0.01)
+        self.assertEqual('token-2', auth.get_token())
+        self.assertEqual(2, len(calls))
+
+        auth.expires_at = time.time() - 1
+        self.assertEqual('token-3', auth.get_token())
+
+    def test_pickle(self):
+        auth = pickle.loads(pickle.dumps(HTTPBearerAuth('abc', refresh_ahead=10)))
+        self.assertEqual('abc', auth.get_token())
+        self.assertEqual(10, auth.refresh_ahead)
@@ -0,0 +1,140 @@
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+from potion_client.cache import SharedCache
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"}
+        }
+    },
+    "group": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"}
+        }
+    }
+}
+
+
+class SharedCacheTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_set_delete(self):
+        cache = SharedCache(self.path)
+        self.assertIsNone(cache.get('/api/user/1'))
+
+        cache.set('/api/user/1', b'{"name": "foo"}')
+        cache.set('/api/user/1', b'{"name": "bar"}')
+        self.assertEqual(b'{"name": "bar"}', SharedCache(self.path).get('/api/user/1'))
+        self.assertEqual(1, len(cache))
+
+        cache.delete('/api/user/1')
+        self.assertIsNone(cache.get('/api/user/1'))
+
+    def test_ttl(self):
+        cache = SharedCache(self.path, ttl=0.05)
+        cache.set('/api/user/1', b'{}')
+        self.assertEqual(b'{}', cache.get('/api/user/1'))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('/api/user/1'))
+        self.assertEqual(0, len(cache))
+
+    def test_eviction(self):
+        cache = SharedCache(self.path, max_size=100)
+        for i in range(1, 6):
+            cache.set('/api/user/{}'.format(i), b'x' * 30)
+
+        self.assertEqual(3, len(cache))
+        self.assertEqual([None, None, b'x' * 30, b'x' * 30, b'x' * 30],
+                         [cache.get('/api/user/{}'.format(i)) for i in range(1, 6)])
+
+        cache.set('/api/user/6', b'x' * 101)
+        self.assertIsNone(cache.get('/api/user/6'))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_shared_between_processes(self):
+        SharedCache(self.path).set('/api/user/1', b'{"name": "foo"}')
+
+        output = subprocess.check_output([sys.executable, '-c', '\n'.join([
+            'import sys',
+            'from potion_client.cache import SharedCache',
+            'cache = SharedCache(sys.argv[1])',
+            'sys.stdout.write(cache.get("/api/user/1").decode("utf-8"))',
+            'cache.set("/api/user/2", b"{}")'
+        ]), self.path], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+        self.assertEqual(b'{"name": "foo"}', output)
+        self.assertEqual(b'{}', SharedCache(self.path).get('/api/user/2'))
+
+
+class ClientCacheTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = SharedCache(os.path.join(self.directory, 'cache.db'))
+        self.server = FakePotionServer(RESOURCES, rows={'user': 5, 'group': 5})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def client(self):
+        client = self.server.client(cache=self.cache)
+        client.User._cache = True
+        return client
+
+    def gets(self, uri):
+        return self.server.requests.count(('GET', 'http://potion.test' + uri))
+
+    def test_fetch_shared_between_clients(self):
+        self.assertEqual('name-1', self.client().User(1).name)
+        self.assertEqual('name-1', self.client().User(1).name)
+        self.assertEqual(1, self.gets('/api/user/1'))
+
+        self.assertEqual(['name-2', 'name-3'], [user.name for user in self.client().User.fetch_many([2, 3])])
+        self.assertEqual(['name-2', 'name-3'], [user.name for user in self.client().User.fetch_many([2, 3])])
+        self.assertEqual(1, self.gets('/api/user/2'))
+
+    def test_opt_in(self):
+        self.assertEqual('name-1', self.client().Group(1).name)
+        self.assertEqual('name-1', self.client().Group(1).name)
+        self.assertEqual(2, self.gets('/api/group/1'))
+        self.assertIsNone(self.cache.get('/api/group/1'))
+
+    def test_save_and_delete_invalidate(self):
+        user = self.client().User(1)
+        user.name = 'foo'
+        user.save()
+        self.assertIsNone(self.cache.get('/api/user/1'))
+        self.assertEqual('foo', self.client().User(1).name)
+
+        self.client().User(1).delete()
+        self.assertIsNone(self.cache.get('/api/user/1'))
+
+    def test_pickle(self):
+        client = pickle.loads(pickle.dumps(self.client()))
+        self.assertEqual(self.cache.path, client.cache.path)
+        self.assertTrue(client.User._cache)
+        self.assertFalse(client.Group._cache)
+
+        self.server.mount(client.session)
+        self.assertEqual('name-1', client.User(1).name)
+        self.assertEqual('name-1', self.client().User(1).name)
+        self.assertEqual(1, self.gets('/api/user/1'))
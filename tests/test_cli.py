@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from potion_client.cli import export_instances, import_instances, make_parser
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+            "created_at": {"type": "object", "properties": {"$date": {"type": "integer"}}}
+        }
+    }
+}
+
+
+class CommandLineTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_export_jsonl(self):
+        server = FakePotionServer(RESOURCES, rows={'user': 45})
+        client = server.client()
+        output = io.StringIO()
+        progress = []
+
+        count = export_instances(client.User,
+                                 output,
+                                 where={'age': {'$gt': 5}},
+                                 sort={'age': True},
+                                 per_page=10,
+                                 concurrency=3,
+                                 progress=lambda *args: progress.append(args))
+
+        items = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(40, count)
+        self.assertEqual(list(range(45, 5, -1)), [item['age'] for item in items])
+        self.assertEqual({"$uri": "/api/user/45", "name": "name-45", "age": 45,
+                          "created_at": {"$date": 1451606400000 + 45 * 3600000}}, items[0])
+        self.assertEqual([(10, 40), (20, 40), (30, 40), (40, 40)], progress)
+        self.assertEqual(4, len([url for method, url in server.requests if '/api/user?' in url]))
+
+    def test_export_csv(self):
+        client = FakePotionServer(RESOURCES, rows={'user': 3}).client()
+        output = io.StringIO()
+
+        export_instances(client.User, output, format='csv', per_page=2)
+
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        self.assertEqual(['$uri', 'age', 'created_at', 'name'], rows[0])
+        self.assertEqual(['/api/user/1', '1', '2016-01-01T01:00:00+00:00', 'name-1'], rows[1])
+        self.assertEqual(4, len(rows))
+
+    def test_import_resume(self):
+        properties = dict(RESOURCES['user']['properties'], created_by={"type": "string", "readOnly": True})
+        server = FakePotionServer({"user": dict(RESOURCES['user'], properties=properties)}, rows={'user': 2})
+        client = server.client()
+        checkpoint = os.path.join(self.directory, 'users.checkpoint')
+        lines = [
+            json.dumps({"name": "Alice", "age": 30, "created_by": "admin"}),
+            json.dumps({"$uri": "/api/user/1", "age": 41, "created_by": "admin"}),
+            '',
+            json.dumps({"$uri": "/api/user/99", "age": 1}),
+            json.dumps({"name": "Bob"}),
+        ]
+
+        rejects = io.StringIO()
+        stats = import_instances(client.User, lines[:3], batch_size=2, checkpoint=checkpoint, rejects=rejects)
+        self.assertEqual({'created': 1, 'updated': 1, 'failed': 0}, stats)
+        with open(checkpoint) as f:
+            self.assertEqual('3', f.read())
+
+        errors = []
+        stats = import_instances(client.User, lines, batch_size=2, checkpoint=checkpoint, rejects=rejects,
+                                 on_error=lambda number, error: errors.append((number, error.response.status_code)))
+        self.assertEqual({'created': 1, 'updated': 0, 'failed': 1}, stats)
+        self.assertEqual(lines[3] + '\n', rejects.getvalue())
+        self.assertEqual([(4, 404)], errors)
+
+        self.assertEqual({1: 41, 2: 2, 3: 30}, {id: item.get('age') for id, item in server.data['user'].items()
+                                                if id < 4})
+        self.assertEqual(['Alice', 'Bob'], [server.data['user'][id]['name'] for id in (3, 4)])
+
+        # read-only properties are not sent back
+        self.assertNotIn('created_by', server.data['user'][3])
+        self.assertEqual('created_by-1', server.data['user'][1]['created_by'])
+
+    def test_parser(self):
+        args = make_parser().parse_args(['http://example.com/api', '--rate', '10', 'export', 'user',
+                                         '--where', '{"age": {"$gt": 1}}', '-f', 'csv'])
+        self.assertEqual('export', args.command)
+        self.assertEqual({"age": {"$gt": 1}}, args.where)
+        self.assertEqual(10.0, args.rate)
+        self.assertEqual('csv', args.format)
+
+    def test_import_validate(self):
+        server = FakePotionServer(dict(RESOURCES, user=dict(RESOURCES['user'], required=['name'])), rows={'user': 0})
+        client = server.client()
+        lines = [json.dumps({"name": "Alice", "age": 30}), json.dumps({"age": 'thirty'}), 'not json']
+
+        stats = import_instances(client.User, lines, validate=True)
+        self.assertEqual({'created': 1, 'updated': 0, 'failed': 2}, stats)
+        self.assertEqual(1, len([method for method, url in server.requests if method == 'POST']))
+
+        # updates are partial, so required properties may be left out
+        stats = import_instances(client.User, [json.dumps({"$uri": "/api/user/1", "age": 31})], validate=True)
+        self.assertEqual({'created': 0, 'updated': 1, 'failed': 0}, stats)
+        self.assertEqual({"$uri": "/api/user/1", "name": "Alice", "age": 31}, server.data['user'][1])
@@ -0,0 +1,84 @@
+import pickle
+import sys
+import types
+from unittest import TestCase
+
+from potion_client import Client
+from potion_client.codegen import generate_module
+from potion_client.resource import ResourceProperty
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "description": "A user.",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string", "description": "The name of the user."},
+            "age": {"type": "integer"},
+            "created_at": {"type": "object", "readOnly": True, "properties": {"$date": {"type": "integer"}}}
+        }
+    },
+    "group": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "owner": {
+                "type": "object",
+                "properties": {"$ref": {"type": "string", "pattern": "^\\/api\\/user\\/[^/]+$"}}
+            }
+        }
+    }
+}
+
+
+class CodeGenerationTestCase(TestCase):
+    def setUp(self):
+        self.server = FakePotionServer(RESOURCES, rows={'user': 3, 'group': 2})
+
+        source = generate_module(self.server.client())
+        self.module = types.ModuleType('generated_api')
+        exec(compile(source, 'generated_api.py', 'exec'), self.module.__dict__)
+        sys.modules['generated_api'] = self.module
+
+    def tearDown(self):
+        del sys.modules['generated_api']
+
+    def test_generated_module(self):
+        self.assertEqual('http://potion.test/api', self.module.API_ROOT_URL)
+        self.assertEqual(['Group', 'User'], [cls.__name__ for cls in self.module.RESOURCES])
+        self.assertEqual('A user.', self.module.User.__doc__)
+        self.assertIsInstance(self.module.User.name, ResourceProperty)
+        self.assertEqual('The name of the user.', self.module.User.name.__doc__)
+        self.assertTrue(self.module.User.created_at.read_only)
+        self.assertEqual({'$uri': False, 'age': True, 'created_at': False, 'name': True},
+                         self.module.User._admission['create'])
+
+    def test_bind_module(self):
+        client = Client(self.server.url, schema_module=self.module)
+        self.server.mount(client.session)
+        requests = len(self.server.requests)
+
+        self.assertTrue(issubclass(client.User, self.module.User))
+        self.assertEqual({'self', 'instances', 'create', 'update', 'destroy'}, set(client.User._links))
+        self.assertTrue(client.User.instances.returns_pagination())
+        self.assertFalse(client.User._create.schema.can_include_property('created_at'))
+        self.assertEqual(requests, len(self.server.requests))
+
+        self.assertEqual('name-2', client.User(2).name)
+        self.assertEqual(client.User(1), client.Group(1).owner)
+
+        with self.assertRaises(AttributeError):
+            client.User(1).created_at = None
+
+        user = client.User(name='Alice')
+        user.save()
+        self.assertEqual(4, user.id)
+
+    def test_bind_module_by_name(self):
+        client = Client(self.server.url, schema_module='generated_api')
+        self.assertTrue(issubclass(client.Group, self.module.Group))
+
+        client = pickle.loads(pickle.dumps(client))
+        self.assertIs(self.module, client._schema_module)
+        self.assertTrue(issubclass(client.User, self.module.User))
@@ -0,0 +1,102 @@
+import time
+from unittest import TestCase
+
+from requests import ReadTimeout
+
+from potion_client.exceptions import DeadlineExceeded
+from potion_client.ratelimit import AdmissionControl
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"}
+        }
+    }
+}
+
+
+class DeadlineTestCase(TestCase):
+    def setUp(self):
+        self.server = FakePotionServer(RESOURCES, rows={'user': 20})
+        self.client = self.server.client()
+        self.server.latency = 0.05
+
+    def test_deadline_bounds_pagination(self):
+        requests = len(self.server.requests)
+        started = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            with self.client.deadline(0.12):
+                list(self.client.User.instances(per_page=1))
+
+        self.assertLess(time.time() - started, 0.3)
+        self.assertLessEqual(len(self.server.requests) - requests, 3)
+
+    def test_request_timeout(self):
+        self.server.latency = 1.0
+        started = time.time()
+        with self.assertRaises(DeadlineExceeded) as context:
+            with self.client.deadline(0.1):
+                self.client.User(1).name
+
+        self.assertLess(time.time() - started, 0.5)
+        self.assertIsInstance(context.exception.__cause__, ReadTimeout)
+
+    def test_nested_deadlines(self):
+        with self.client.deadline(0.01):
+            with self.client.deadline(10):
+                time.sleep(0.02)
+                with self.assertRaises(DeadlineExceeded):
+                    self.client.User(1).name
+
+        self.assertIsNone(self.client._local.deadline)
+        self.assertEqual('name-1', self.client.User(1).name)
+
+    def test_deadline_in_threads(self):
+        uris = ['/api/user/{}'.format(i) for i in range(1, 21)]
+        with self.client.deadline(0.12):
+            results = self.client.fetch_many(uris, concurrency=2)
+
+        self.assertTrue(any(isinstance(result, DeadlineExceeded) for result in results))
+        self.assertEqual('name-1', results[0].name)
+        self.assertLess(len(self.server.requests), 20)
+
+    def test_deadline_of_lazy_map(self):
+        with self.client.deadline(0.01):
+            results = self.client.User.self.map([{'id': i} for i in range(1, 6)], concurrency=1)
+        time.sleep(0.02)
+
+        self.assertTrue(all(isinstance(result, DeadlineExceeded) for result in results))
+
+    def test_deadline_stops_retries(self):
+        self.server.latency = 0
+        self.server.rate_limit = 0
+        self.client.admission = AdmissionControl(retries=10)
+
+        started = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            with self.client.deadline(0.2):
+                self.client.fetch('/api/user/1')
+
+        # the server asks to retry after one second, which is past the deadline
+        self.assertLess(time.time() - started, 0.1)
+
+    def test_deadline_bounds_admission(self):
+        self.server.latency = 0
+        self.client.admission = AdmissionControl(rate=1, burst=1)
+        self.client.fetch('/api/user/1')
+
+        started = time.time()
+        with self.assertRaises(DeadlineExceeded):
+            with self.client.deadline(0.2):
+                self.client.fetch('/api/user/2')
+        self.assertLess(time.time() - started, 0.1)
+
+        self.client.admission = AdmissionControl(concurrency=1)
+        self.client.admission.limit.acquire()
+        with self.assertRaises(DeadlineExceeded):
+            with self.client.deadline(0.1):
+                self.client.fetch('/api/user/2')
+        self.assertEqual(1, self.client.admission.limit.in_flight)
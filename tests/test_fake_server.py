@@ -0,0 +1,110 @@
+from unittest import TestCase
+
+from requests import HTTPError
+
+from potion_client import Client
+from potion_client.ratelimit import AdmissionControl
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+            "created_at": {"type": "object", "properties": {"$date": {"type": "integer"}}}
+        }
+    },
+    "group": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "owner": {
+                "type": "object",
+                "properties": {"$ref": {"type": "string", "pattern": "^\\/api\\/user\\/[^/]+$"}}
+            }
+        }
+    }
+}
+
+
+class FakePotionServerTestCase(TestCase):
+    def test_schema_and_instances(self):
+        server = FakePotionServer(RESOURCES, rows={'user': 45, 'group': 3})
+        client = server.client()
+
+        users = client.User.instances(per_page=20)
+        self.assertEqual(45, len(users))
+        self.assertEqual(['name-{}'.format(i) for i in range(1, 46)], [user.name for user in users])
+
+        self.assertEqual(client.User(2), client.Group(2).owner)
+        self.assertEqual(2, client.Group(2).owner.age)
+        self.assertEqual(2016, client.User(1).created_at.year)
+
+    def test_where_and_sort(self):
+        client = FakePotionServer(RESOURCES, rows={'user': 10}).client()
+
+        users = client.User.instances(where={'age': {'$gte': 8}}, sort={'age': True})
+        self.assertEqual([10, 9, 8], [user.age for user in users])
+        self.assertEqual(['name-3'], [user.name for user in client.User.instances(where={'name': 'name-3'})])
+
+    def test_pagination_limits(self):
+        server = FakePotionServer(RESOURCES, rows={'user': 10})
+        client = server.client()
+
+        self.assertEqual(10, len(client.User.instances(per_page=100)))
+        for params in ({'per_page': 101}, {'page': 0}):
+            with self.assertRaises(HTTPError) as context:
+                client.User.instances(**params)
+            self.assertEqual(400, context.exception.response.status_code)
+
+    def test_create_update_destroy(self):
+        client = FakePotionServer(RESOURCES, rows={'user': 2}).client()
+
+        user = client.User(name='Bob', age=30)
+        user.save()
+        self.assertEqual(3, user.id)
+
+        user.age = 31
+        user.save()
+        self.assertEqual(31, client.fetch('/api/user/3')['age'])
+
+        user.delete()
+        with self.assertRaises(HTTPError):
+            client.fetch('/api/user/3')
+
+    def test_mount(self):
+        server = FakePotionServer(RESOURCES, url='http://other.test/v1', rows={'user': 1})
+        client = Client('http://other.test/v1', fetch_schema=False)
+        server.mount(client.session)
+        client._fetch_schema()
+
+        self.assertEqual('name-1', client.User(1).name)
+        self.assertIn(('GET', 'http://other.test/v1/user/1'), server.requests)
+
+    def test_errors_and_throttling(self):
+        server = FakePotionServer(RESOURCES, rows={'user': 1}, error_rate=1.0)
+        client = Client(server.url, fetch_schema=False)
+        server.mount(client.session)
+
+        with self.assertRaises(HTTPError) as context:
+            client.fetch('/api/user/1')
+        self.assertEqual(500, context.exception.response.status_code)
+
+        server = FakePotionServer(RESOURCES, rows={'user': 1}, rate_limit=0)
+        client = Client(server.url, fetch_schema=False, admission=AdmissionControl(retries=0))
+        server.mount(client.session)
+
+        with self.assertRaises(HTTPError) as context:
+            client.fetch('/api/user/1')
+        self.assertEqual(429, context.exception.response.status_code)
+        self.assertEqual('1', context.exception.response.headers['Retry-After'])
+
+    def test_reproducible_latency(self):
+        def delays(seed):
+            server = FakePotionServer(RESOURCES, rows={'user': 1}, jitter=1.0, seed=seed)
+            return [server._random.uniform(0, server.jitter) for _ in range(3)]
+
+        self.assertEqual(delays(1), delays(1))
+        self.assertNotEqual(delays(1), delays(2))
@@ -1,4 +1,6 @@
 import json
+import time
+import zlib
 from datetime import datetime
 from unittest import TestCase, SkipTest
 from six.moves.urllib.parse import urlparse, parse_qs
@@ -6,7 +8,10 @@ from requests import HTTPError
 import responses
 from potion_client import Client, Resource, PotionJSONDecoder, uri_for
 from potion_client.converter import PotionJSONEncoder, timezone
-from potion_client.collection import PaginatedList
+from potion_client.compression import RequestCompression
+from potion_client.hedging import HedgingPolicy
+from potion_client.ratelimit import AdmissionControl
+from potion_client.collection import PaginatedList, AdaptivePerPage
 from potion_client.exceptions import ItemNotFound
 
 
@@ -93,6 +98,157 @@ class ClientInitTestCase(TestCase):
 
         self.assertEqual(user, client.User(123)._self())
 
+    @responses.activate
+    def test_fetch_many(self):
+        client = Client('http://example.com', fetch_schema=False)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"}
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/user/{id}",
+                    "method": "GET"
+                }
+            ]
+        })
+
+        for i in (1, 2):
+            responses.add(responses.GET, 'http://example.com/user/{}'.format(i), json={
+                "$uri": "/user/{}".format(i),
+                "name": "user-{}".format(i)
+            })
+
+        responses.add(responses.GET, 'http://example.com/user/3', status=404, json={
+            "status": 404,
+            "message": "Not Found"
+        })
+
+        loaded = User(4, name="user-4")
+        result = client.fetch_many(['/user/1', '/user/2', '/user/3', '/user/4', '/user/1'], concurrency=2)
+
+        self.assertIs(User(1), result[0])
+        self.assertEqual("user-2", result[1].name)
+        self.assertIsInstance(result[2], HTTPError)
+        self.assertIs(loaded, result[3])
+        self.assertIs(result[0], result[4])
+        self.assertEqual(3, len(responses.calls))
+
+        self.assertEqual([User(1), User(2)], User.fetch_many([1, 2]))
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_hedged_fetch(self):
+        client = Client('http://example.com', fetch_schema=False,
+                        hedging=HedgingPolicy(initial_delay=0.05, max_fraction=0.5))
+
+        calls = []
+
+        def request_callback(request):
+            calls.append(request.url)
+            if len(calls) == 1:
+                time.sleep(0.5)
+            return 200, {}, json.dumps({"$uri": "/user/1", "name": "foo"})
+
+        responses.add_callback(responses.GET, 'http://example.com/user/1',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        started = time.time()
+        self.assertEqual({"$uri": "/user/1", "name": "foo"}, client.fetch('/user/1', uri_to_instance=False))
+        self.assertLess(time.time() - started, 0.4)
+        self.assertEqual(2, len(calls))
+        self.assertEqual(1, client.hedging.hedged)
+
+        # hedging is capped at half of the requests:
+        del calls[:]
+        client.fetch('/user/1', uri_to_instance=False)
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, client.hedging.hedged)
+
+    @responses.activate
+    def test_admission_control_retry(self):
+        client = Client('http://example.com', fetch_schema=False,
+                        admission=AdmissionControl(rate=1000, concurrency=2, retries=2, backoff=0.01))
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"}
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/user/{id}",
+                    "method": "GET"
+                },
+                {
+                    "rel": "create",
+                    "href": "/user",
+                    "method": "POST"
+                }
+            ]
+        })
+
+        statuses = [429, 503, 200]
+
+        def request_callback(request):
+            status = statuses.pop(0)
+            if status != 200:
+                return status, {'Retry-After': '0'}, json.dumps({"status": status})
+            return 200, {}, json.dumps({"$uri": "/user/1", "name": "foo"})
+
+        responses.add_callback(responses.GET, 'http://example.com/user/1',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        responses.add(responses.POST, 'http://example.com/user', status=429, json={"status": 429})
+
+        self.assertEqual("foo", User.fetch(1).name)
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(2, int(client.admission.limit.limit))
+
+        # non-idempotent requests are not retried
+        with self.assertRaises(HTTPError) as ctx:
+            User.create(name="bar")
+
+        self.assertEqual(429, ctx.exception.response.status_code)
+        self.assertEqual(4, len(responses.calls))
+
+    @responses.activate
+    def test_admission_control_retry_once(self):
+        client = Client('http://example.com', fetch_schema=False,
+                        admission=AdmissionControl(concurrency=8, retries=2, backoff=0.01))
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"}
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/user/{id}",
+                    "method": "GET"
+                }
+            ]
+        })
+        User._links['self'].admission = AdmissionControl(concurrency=8, retries=2, backoff=0.01)
+
+        responses.add(responses.GET, 'http://example.com/user/1', status=429, json={"status": 429},
+                      headers={'Retry-After': '0'})
+
+        with self.assertRaises(HTTPError):
+            User.fetch(1)
+
+        # the link retries the request; the client only admits each attempt
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual(8 * 0.5 ** 3, client.admission.limit.limit)
+        self.assertEqual(8 * 0.5 ** 3, User._links['self'].admission.limit.limit)
+
     @responses.activate
     def test_api_uri_with_port(self):
         responses.add(responses.GET, 'http://example.com:5000/api/schema', json={
@@ -149,6 +305,53 @@ class ClientInitTestCase(TestCase):
 
         # TODO user.save() for create
 
+    @responses.activate
+    def test_request_compression(self):
+        client = Client('http://example.com', fetch_schema=False, compression=RequestCompression('gzip', threshold=100))
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"}
+            },
+            "links": [
+                {
+                    "rel": "create",
+                    "href": "/user",
+                    "method": "POST"
+                },
+                {
+                    "rel": "bulkImport",
+                    "href": "/user/import",
+                    "method": "POST"
+                }
+            ]
+        })
+
+        def request_callback(request):
+            body = request.body
+            if request.headers.get('Content-Encoding') == 'gzip':
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            if isinstance(body, bytes):
+                body = body.decode('utf-8')
+            return 200, {}, json.dumps({'encoding': request.headers.get('Content-Encoding'),
+                                        'size': len(json.loads(body)['names'])})
+
+        responses.add_callback(responses.POST, 'http://example.com/user', callback=request_callback,
+                               content_type='application/json')
+        responses.add_callback(responses.POST, 'http://example.com/user/import', callback=request_callback,
+                               content_type='application/json')
+
+        self.assertEqual({'encoding': None, 'size': 1}, User.create(names=['foo']))
+        self.assertEqual({'encoding': 'gzip', 'size': 100}, User.create(names=['foo'] * 100))
+
+        User.bulk_import.link.compression = False
+        self.assertEqual({'encoding': None, 'size': 100}, User.bulk_import(names=['foo'] * 100))
+
+        self.assertEqual(2, client.compression.stats.requests)
+        self.assertEqual(1, client.compression.stats.compressed)
+        self.assertLess(client.compression.stats.ratio, 0.1)
+
     @responses.activate
     def test_first(self):
         client = Client('http://example.com', fetch_schema=False)
@@ -656,6 +859,294 @@ class ClientInitTestCase(TestCase):
         self.assertEqual(20, len(result._pages[1]))
         self.assertEqual(15, len(result._pages[2]))
 
+    @responses.activate
+    def test_pagination_adaptive(self):
+        client = Client('http://example.com', fetch_schema=False)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {
+                                "default": 1,
+                                "minimum": 1,
+                                "type": "integer"
+                            },
+                            "per_page": {
+                                "default": 20,
+                                "maximum": 20,
+                                "minimum": 1,
+                                "type": "integer"
+                            }
+                        }
+                    }
+                }
+            ]
+        })
+
+        requested = []
+
+        def request_callback(request):
+            users = [
+                {
+                    "$uri": "/user/{}".format(i),
+                    "name": "user-{}".format(i)
+                } for i in range(1, 36)
+                ]
+
+            params = parse_qs(urlparse(request.url).query)
+            per_page = int(params['per_page'][0])
+            offset = (int(params['page'][0]) - 1) * per_page
+            requested.append((offset, per_page))
+            return 200, {'X-Total-Count': '35'}, json.dumps(users[offset:offset + per_page])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        result = User.instances(per_page=AdaptivePerPage(initial=5, target_latency=60))
+
+        self.assertEqual(35, len(result))
+        self.assertEqual([
+                             {
+                                 "$uri": "/user/{}".format(i),
+                                 "name": "user-{}".format(i)
+                             } for i in range(1, 36)
+                             ], list(result))
+        self.assertEqual([(0, 5), (5, 5), (10, 10), (20, 20)], requested)
+        self.assertEqual("user-13", result[12].name)
+        self.assertEqual(4, len(requested))
+
+    @responses.activate
+    def test_pagination_partition(self):
+        client = Client('http://example.com', fetch_schema=False)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"},
+                            "where": {"type": "object"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        def request_callback(request):
+            users = [
+                {
+                    "$uri": "/user/{}".format(i),
+                    "name": "user-{}".format(i)
+                } for i in range(1, 36)
+                ]
+
+            params = parse_qs(urlparse(request.url).query)
+            self.assertEqual({"name": {"$ne": None}}, json.loads(params['where'][0]))
+            offset = (int(params['page'][0]) - 1) * int(params['per_page'][0])
+            return 200, {'X-Total-Count': '35'}, json.dumps(users[offset:offset + int(params['per_page'][0])])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        shards = User.instances(where={"name": {"$ne": None}}, per_page=5).partition(3)
+
+        self.assertEqual([(1, 3), (3, 5), (5, 8)], [(shard.start_page, shard.end_page) for shard in shards])
+        self.assertEqual([10, 10, 15], [len(shard) for shard in shards])
+        self.assertEqual([User('/user/{}'.format(i)) for i in range(1, 36)],
+                         [item for shard in shards for item in shard])
+
+        self.assertEqual(1, len(User.instances(where={"name": {"$ne": None}}).partition(10, per_page=50)))
+
+    @responses.activate
+    def test_pagination_to_columns(self):
+        try:
+            import numpy
+        except ImportError:
+            raise SkipTest("NumPy is not installed")
+
+        client = Client('http://example.com', fetch_schema=False)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                },
+                "age": {
+                    "type": ["integer", "null"]
+                },
+                "active": {
+                    "type": "boolean"
+                },
+                "created_at": {
+                    "type": "object",
+                    "properties": {
+                        "$date": {"type": "integer"}
+                    }
+                },
+                "parent": {
+                    "type": "object",
+                    "properties": {
+                        "$ref": {"type": "string"}
+                    }
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        def request_callback(request):
+            users = [
+                {
+                    "$uri": "/user/{}".format(i),
+                    "name": "user-{}".format(i),
+                    "age": i if i != 3 else None,
+                    "active": i % 2 == 0,
+                    "created_at": {"$date": 1451060269000 + i},
+                    "parent": {"$ref": "/user/{}".format(i + 1)}
+                } for i in range(1, 6)
+                ]
+
+            params = parse_qs(urlparse(request.url).query)
+            offset = (int(params['page'][0]) - 1) * int(params['per_page'][0])
+            return 200, {'X-Total-Count': '5'}, json.dumps(users[offset:offset + int(params['per_page'][0])])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        users = User.instances(per_page=2)
+        columns = users.to_columns()
+
+        self.assertEqual(['$uri', 'active', 'age', 'created_at', 'name', 'parent'], sorted(columns))
+        self.assertEqual(['/user/1', '/user/2', '/user/3', '/user/4', '/user/5'], list(columns['$uri']))
+        self.assertEqual('float64', columns['age'].dtype)
+        self.assertTrue(numpy.isnan(columns['age'][2]))
+        self.assertEqual('bool', columns['active'].dtype)
+        self.assertEqual('datetime64[ms]', columns['created_at'].dtype)
+        self.assertEqual(numpy.datetime64(1451060269001, 'ms'), columns['created_at'][0])
+        self.assertEqual('/user/6', columns['parent'][4])
+
+        # the first page is fetched once and none of the items are converted to instances
+        self.assertEqual(3, len(responses.calls))
+        self.assertEqual([None] * 5, [client._instances.get('/user/{}'.format(i)) for i in range(1, 6)])
+
+        self.assertEqual('user-1', users[0].name)
+        self.assertIs(User('/user/1'), client._instances.get('/user/1'))
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_pagination_lazy_decoding(self):
+        client = Client('http://example.com', fetch_schema=False, lazy_decoding=True)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        responses.add(responses.GET, 'http://example.com/user', json=[
+            {
+                "$uri": "/user/{}".format(i),
+                "name": "user-{}".format(i),
+                "created_at": {"$date": 1451060269000},
+                "friends": [{"$ref": "/user/1"}]
+            } for i in range(1, 6)
+            ])
+
+        users = User.instances()
+        self.assertEqual(5, len(users))
+        self.assertIsNone(client._instances.get('/user/2'))
+
+        user = users[1]
+        self.assertIs(User('/user/2'), user)
+        self.assertIsNone(client._instances.get('/user/3'))
+        self.assertEqual({"$date": 1451060269000}, user._properties._values['created_at'])
+
+        self.assertEqual("user-2", user.name)
+        self.assertEqual(datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc), user['created_at'])
+        self.assertEqual([User('/user/1')], user['friends'])
+        self.assertEqual({
+            "$uri": "/user/2",
+            "name": "user-2",
+            "created_at": datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc),
+            "friends": [User('/user/1')]
+        }, dict(user))
+
+        user.name = "foo"
+        self.assertEqual("foo", user.name)
+        self.assertEqual([User('/user/{}'.format(i)) for i in range(1, 6)], list(users))
+
     @responses.activate
     def test_response_errors(self):
         client = Client('http://example.com', fetch_schema=False)
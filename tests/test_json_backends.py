@@ -0,0 +1,102 @@
+from datetime import datetime
+from unittest import TestCase, SkipTest
+
+from potion_client import Client, Resource
+from potion_client.backends import get_backend
+from potion_client.converter import PotionJSONSchemaDecoder, timezone
+
+
+class JSONBackendConformanceMixin(object):
+    backend = None
+
+    def setUp(self):
+        try:
+            get_backend(self.backend)
+        except ImportError:
+            raise SkipTest("JSON backend '{}' is not installed".format(self.backend))
+
+        self.client = client = Client('http://example.com', fetch_schema=False, json_backend=self.backend)
+        self.User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "method": "GET",
+                    "href": "/user/{id}"
+                }
+            ]
+        })
+
+    def test_backend(self):
+        self.assertEqual(self.backend or 'json', self.client._json.name)
+
+    def test_encode_date(self):
+        result = self.client._json.loads(self.client._encode({
+            "start_date": datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc)
+        }))
+
+        self.assertEqual({"start_date": {"$date": 1451060269000}}, result)
+
+    def test_encode_reference(self):
+        result = self.client._json.loads(self.client._encode([self.User(uri='/user/123', name="foo")]))
+        self.assertEqual([{"$ref": "/user/123"}], result)
+
+    def test_encode_self_reference(self):
+        value = {"name": "foo"}
+        value["self"] = value
+        self.assertEqual({"name": "foo", "self": {"$ref": "#"}}, self.client._json.loads(self.client._encode(value)))
+
+    def test_encode_unicode(self):
+        self.assertEqual({"name": u"Müller ☃"},
+                         self.client._json.loads(self.client._encode({"name": u"Müller ☃"})))
+
+    def test_decode_date(self):
+        result = self.client._decode(b'{"start_date": {"$date": 1451060269000}}')
+        self.assertEqual({"start_date": datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc)}, result)
+
+    def test_decode_reference(self):
+        result = self.client._decode(b'{"owner": {"$ref": "/user/123"}, "related": {"$ref": "#"}}', referrer='/user/1')
+        self.assertIs(self.User(123), result['owner'])
+        self.assertIs(self.User(1), result['related'])
+
+    def test_decode_instance(self):
+        result = self.client._decode(b'[{"$uri": "/user/2", "name": "foo", "friends": [{"$ref": "/user/3"}]}]')
+        self.assertIsInstance(result[0], Resource)
+        self.assertIs(self.User(2), result[0])
+        self.assertEqual("foo", result[0].name)
+        self.assertEqual([self.User(3)], result[0]['friends'])
+
+    def test_decode_without_instances(self):
+        result = self.client._decode(b'{"$uri": "/user/4", "name": "foo"}', uri_to_instance=False)
+        self.assertEqual({"$uri": "/user/4", "name": "foo"}, result)
+
+    def test_decode_schema(self):
+        result = self.client._decode(b'{"type": "object", "properties": {"parent": {"$ref": "#"}}}',
+                                     cls=PotionJSONSchemaDecoder,
+                                     referrer='/user/schema')
+        self.assertIs(result, result['properties']['parent'])
+
+
+class StdlibJSONBackendTestCase(JSONBackendConformanceMixin, TestCase):
+    backend = None
+
+
+class SimpleJSONBackendTestCase(JSONBackendConformanceMixin, TestCase):
+    backend = 'simplejson'
+
+
+class UJSONBackendTestCase(JSONBackendConformanceMixin, TestCase):
+    backend = 'ujson'
+
+
+class OrjsonBackendTestCase(JSONBackendConformanceMixin, TestCase):
+    backend = 'orjson'
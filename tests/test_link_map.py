@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from requests import HTTPError
+
+from potion_client.testing import FakePotionServer, default_links
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"}
+        },
+        "links": default_links('/api/user') + [
+            {
+                "rel": "archive",
+                "href": "/api/user/{id}/archive",
+                "method": "POST",
+                "schema": {
+                    "type": "object",
+                    "properties": {"reason": {"type": "string"}}
+                }
+            }
+        ]
+    }
+}
+
+
+class LinkMapTestCase(TestCase):
+    def setUp(self):
+        self.server = FakePotionServer(RESOURCES, rows={'user': 20})
+        self.client = self.server.client()
+
+    def test_map_params(self):
+        results = list(self.client.User.self.map([{'id': i} for i in (3, 1, 99, 2)], concurrency=4))
+
+        self.assertEqual([self.client.User(3), self.client.User(1)], results[:2])
+        self.assertIsInstance(results[2], HTTPError)
+        self.assertEqual('name-2', results[3].name)
+
+    def test_map_instances(self):
+        users = [self.client.User(i) for i in range(1, 11)]
+        results = list(self.client.User.archive.map([(user, {'reason': user.id}) for user in users[:5]] + users[5:]))
+
+        self.assertEqual([{'reason': i} for i in range(1, 6)] + [{}] * 5, results)
+        self.assertEqual(10, len([url for method, url in self.server.requests if url.endswith('/archive')]))
+
+    def test_map_bound(self):
+        user = self.client.User(1)
+        self.assertEqual([{'reason': 'a'}, {'reason': 'b'}], list(user.archive.map([{'reason': 'a'}, {'reason': 'b'}])))
+
+    def test_map_unordered(self):
+        self.server.jitter = 0.01
+        items = ({'id': i} for i in range(1, 21))
+        results = list(self.client.User.self.map(items, concurrency=3, ordered=False))
+
+        self.assertEqual(set(range(1, 21)), {user.id for user in results})
+
+    def test_map_consumes_items_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(10000):
+                consumed.append(i)
+                yield {'id': i % 20 + 1}
+
+        for ordered in (True, False):
+            del consumed[:]
+            results = self.client.User.self.map(items(), concurrency=2, ordered=ordered)
+            self.assertEqual(3, len([next(results) for _ in range(3)]))
+            results.close()
+
+            self.assertLessEqual(len(consumed), 3 + 2 * 2)
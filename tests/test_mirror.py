@@ -0,0 +1,236 @@
+import json
+import os
+import shelve
+import shutil
+import tempfile
+from unittest import TestCase
+
+from six.moves.urllib.parse import urlparse, parse_qs
+from requests import HTTPError
+import responses
+
+from potion_client import Client
+from potion_client.mirror import Mirror
+from potion_client.testing import FakePotionServer
+
+
+class MirrorTestCase(TestCase):
+    @responses.activate
+    def test_delta_sync(self):
+        client = Client('http://example.com', fetch_schema=False)
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                },
+                "updated_at": {
+                    "type": "object",
+                    "properties": {
+                        "$date": {"type": "integer"}
+                    }
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"},
+                            "where": {"type": "object"},
+                            "sort": {"type": "object"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        users = {i: {"$uri": "/user/{}".format(i), "name": "user-{}".format(i), "updated_at": {"$date": 1000 + i}}
+                 for i in range(1, 8)}
+        queries = []
+
+        def request_callback(request):
+            params = parse_qs(urlparse(request.url).query)
+            where = json.loads(params['where'][0])
+            queries.append(where)
+            self.assertEqual({"updated_at": False}, json.loads(params['sort'][0]))
+
+            items = sorted(users.values(), key=lambda user: user['updated_at']['$date'])
+            if '$gt' in where.get('updated_at', {}):
+                items = [item for item in items if item['updated_at']['$date'] > where['updated_at']['$gt']['$date']]
+            if '$gte' in where.get('updated_at', {}):
+                items = [item for item in items if item['updated_at']['$date'] >= where['updated_at']['$gte']['$date']]
+
+            per_page = int(params['per_page'][0])
+            offset = (int(params['page'][0]) - 1) * per_page
+            return 200, {'X-Total-Count': str(len(items))}, json.dumps(items[offset:offset + per_page])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        directory = tempfile.mkdtemp()
+        try:
+            store = shelve.open(os.path.join(directory, 'users'))
+            mirror = Mirror(User, 'updated_at', store=store, per_page=3)
+
+            self.assertEqual(7, mirror.sync())
+            self.assertEqual(7, len(mirror))
+            self.assertEqual({"$date": 1007}, mirror.watermark)
+            self.assertEqual({}, queries[0])
+
+            users[2] = {"$uri": "/user/2", "name": "renamed", "updated_at": {"$date": 2000}}
+            users[8] = {"$uri": "/user/8", "name": "user-8", "updated_at": {"$date": 2001}}
+
+            del queries[:]
+            self.assertEqual(2, mirror.sync())
+            self.assertEqual([{"updated_at": {"$gt": {"$date": 1007}}}], queries[:1])
+            self.assertEqual(8, len(mirror))
+            self.assertEqual("renamed", mirror['/user/2'].name)
+            self.assertIs(User('/user/8'), mirror['/user/8'])
+            store.close()
+
+            mirror = Mirror(User, 'updated_at', store=shelve.open(os.path.join(directory, 'users')))
+            self.assertEqual({"$date": 2001}, mirror.watermark)
+            self.assertEqual(0, mirror.sync())
+            self.assertEqual(8, len(mirror))
+            mirror.store.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sync_with_changes_during_sync(self):
+        server = FakePotionServer({
+            "user": {
+                "type": "object",
+                "properties": {
+                    "$uri": {"type": "string", "readOnly": True},
+                    "name": {"type": "string"},
+                    "updated": {"type": "integer"}
+                }
+            }
+        }, rows={'user': 6})
+        User = server.client().User
+
+        mirror = Mirror(User, 'updated', per_page=2)
+        self.assertEqual(6, mirror.sync())
+        self.assertEqual(6, mirror.watermark)
+
+        for id, updated in ((1, 11), (2, 12), (3, 13), (4, 14)):
+            server.data['user'][id]['updated'] = updated
+
+        handle = server._handle
+        queries = []
+
+        def handle_and_update(request, name, rel, path_params, params):
+            response = handle(request, name, rel, path_params, params)
+            queries.append(json.loads(params['where']))
+            if len(queries) == 1:
+                # an instance that has already been received changes again once the first page has been served
+                server.data['user'][1]['updated'] = 15
+            return response
+
+        server._handle = handle_and_update
+
+        self.assertEqual(5, mirror.sync())
+        self.assertEqual(15, mirror.watermark)
+        self.assertEqual(13, mirror.raw('/api/user/3')['updated'])
+        self.assertEqual(15, mirror.raw('/api/user/1')['updated'])
+        self.assertEqual([{"updated": {"$gt": 6}}] + [{"updated": {"$gte": value}} for value in (12, 13, 14, 15)],
+                         queries)
+
+    def test_sync_merges_where(self):
+        server = FakePotionServer({
+            "user": {
+                "type": "object",
+                "properties": {
+                    "$uri": {"type": "string", "readOnly": True},
+                    "updated": {"type": "integer"}
+                }
+            }
+        }, rows={'user': 10})
+        User = server.client().User
+
+        mirror = Mirror(User, 'updated', where={"updated": {"$lte": 5}}, per_page=2)
+        self.assertEqual(5, mirror.sync())
+        self.assertEqual(['/api/user/{}'.format(i) for i in range(1, 6)], sorted(mirror))
+        self.assertEqual({"updated": {"$lte": 5, "$gte": 5}}, mirror._where("$gte", 5))
+
+        for i in range(1, 11):
+            server.data['user'][i]['updated'] = 10 + i
+        server.data['user'][1]['updated'] = 4
+
+        mirror = Mirror(User, 'updated', store=mirror.store, where={"updated": {"$lte": 5, "$gt": 0}})
+        self.assertEqual({"updated": {"$lte": 5, "$gt": 5}}, mirror._where("$gt", mirror.watermark))
+        self.assertEqual(0, mirror.sync())
+
+        mirror = Mirror(User, 'updated', where={"updated": 4})
+        self.assertEqual(1, mirror.sync())
+        self.assertEqual({"updated": {"$eq": 4, "$gt": 4}}, mirror._where("$gt", mirror.watermark))
+
+    def test_resume_within_tied_values(self):
+        server = FakePotionServer({
+            "user": {
+                "type": "object",
+                "properties": {
+                    "$uri": {"type": "string", "readOnly": True},
+                    "updated": {"type": "integer"}
+                }
+            }
+        }, rows={'user': 5})
+        for item in server.data['user'].values():
+            item['updated'] = 1
+        User = server.client().User
+
+        handle = server._handle
+        requests = []
+
+        def handle_or_fail(request, name, rel, path_params, params):
+            requests.append(params)
+            if len(requests) == 2:
+                return server._response(request, 503, {"status": 503, "message": "Service Unavailable"})
+            return handle(request, name, rel, path_params, params)
+
+        server._handle = handle_or_fail
+
+        mirror = Mirror(User, 'updated', per_page=2)
+        with self.assertRaises(HTTPError):
+            mirror.sync()
+        self.assertEqual(2, len(mirror))
+        self.assertEqual(['/api/user/1', '/api/user/2'], mirror.store[Mirror.SEEN_KEY])
+
+        self.assertEqual(3, mirror.sync())
+        self.assertEqual(5, len(mirror))
+        self.assertEqual({"updated": {"$gte": 1}}, json.loads(requests[2]['where']))
+        self.assertNotIn(Mirror.SEEN_KEY, mirror.store)
+        self.assertEqual(['/api/user/{}'.format(i) for i in range(1, 6)], sorted(mirror))
+
+    def test_tied_values_beyond_maximum_page_size(self):
+        server = FakePotionServer({
+            "user": {
+                "type": "object",
+                "properties": {
+                    "$uri": {"type": "string", "readOnly": True},
+                    "updated": {"type": "integer"}
+                }
+            }
+        }, rows={'user': 260})
+        for id, item in server.data['user'].items():
+            item['updated'] = 1 if id <= 250 else id
+        User = server.client().User
+
+        mirror = Mirror(User, 'updated', per_page=60)
+        self.assertEqual(260, mirror.sync())
+        self.assertEqual(260, len(mirror))
+        self.assertEqual(260, mirror.watermark)
+
+        pages = [parse_qs(urlparse(url).query) for method, url in server.requests if '/api/user?' in url]
+        self.assertEqual([('1', '60'), ('1', '60'), ('1', '100'), ('2', '100'), ('3', '100')],
+                         [(params['page'][0], params['per_page'][0]) for params in pages])
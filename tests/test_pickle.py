@@ -0,0 +1,116 @@
+import pickle
+from datetime import datetime
+from unittest import TestCase
+
+import responses
+
+from potion_client import Client, Resource
+from potion_client.converter import timezone
+from potion_client.compression import RequestCompression
+from potion_client.ratelimit import AdmissionControl
+
+
+class Vehicle(Resource):
+    def is_car(self):
+        return self.wheels == 4
+
+
+class PickleTestCase(TestCase):
+    def setUp(self):
+        responses.add(responses.GET, 'http://example.com/api/schema', json={
+            "properties": {
+                "user": {"$ref": "/api/user/schema#"}
+            }
+        })
+
+        responses.add(responses.GET, 'http://example.com/api/user/schema', json={
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {"type": "string"},
+                "friend": {
+                    "type": "object",
+                    "properties": {
+                        "$ref": {"type": "string"}
+                    }
+                }
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/api/user/{id}",
+                    "method": "GET"
+                }
+            ]
+        })
+
+        responses.add(responses.GET, 'http://example.com/api/user/1', json={
+            "$uri": "/api/user/1",
+            "name": "foo",
+            "created_at": {"$date": 1451060269000},
+            "friend": {"$ref": "/api/user/2"}
+        })
+
+        responses.add(responses.GET, 'http://example.com/api/user/2', json={
+            "$uri": "/api/user/2",
+            "name": "bar",
+            "friend": {"$ref": "/api/user/1"}
+        })
+
+    @responses.activate
+    def test_pickle_client(self):
+        client = Client('http://example.com/api',
+                        compression=RequestCompression('gzip', threshold=512),
+                        admission=AdmissionControl(rate=10, concurrency=4))
+        client.resource_factory('vehicle', {
+            "type": "object",
+            "properties": {
+                "wheels": {"type": "number"}
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/api/vehicle/{id}",
+                    "method": "GET"
+                }
+            ]
+        }, resource_cls=Vehicle)
+
+        calls = len(responses.calls)
+        restored = pickle.loads(pickle.dumps(client))
+
+        self.assertEqual(calls, len(responses.calls))
+        self.assertIsNot(client, restored)
+        self.assertEqual(client.User._schema, restored.User._schema)
+        self.assertEqual(512, restored.compression.threshold)
+        self.assertEqual(10, restored.admission.bucket.rate)
+        self.assertTrue(issubclass(restored._resource_classes['vehicle'], Vehicle))
+        self.assertTrue(restored._resource_classes['vehicle'](wheels=4).is_car())
+
+    @responses.activate
+    def test_pickle_resources(self):
+        client = Client('http://example.com/api')
+        user = client.User.fetch(1)
+        self.assertEqual("bar", user.friend.name)
+        unresolved = client.User(3)
+        unsaved = client.User(name="baz")
+
+        restored_user, restored_unresolved, restored_unsaved = pickle.loads(pickle.dumps([user, unresolved, unsaved]))
+        calls = len(responses.calls)
+
+        restored_client = restored_user._client
+        self.assertIsNot(client, restored_client)
+        self.assertIs(restored_client.User(1), restored_user)
+        self.assertIsInstance(restored_user, restored_client.User)
+        self.assertEqual("foo", restored_user.name)
+        self.assertEqual(datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc), restored_user['created_at'])
+        self.assertIs(restored_client.User(2), restored_user.friend)
+        self.assertIs(restored_user, restored_user.friend.friend)
+        self.assertEqual(calls, len(responses.calls))
+
+        self.assertIsNone(restored_unresolved._status)
+        self.assertIs(restored_client.User(3), restored_unresolved)
+        self.assertEqual({"$uri": None, "name": "baz"}, restored_unsaved._properties)
@@ -0,0 +1,113 @@
+from datetime import datetime
+from unittest import TestCase
+
+from potion_client.converter import timezone
+from potion_client.exceptions import ItemNotFound, MultipleItemsFound
+from potion_client.query import LocalCollection, matches, sort_items
+from potion_client.testing import FakePotionServer
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string"},
+            "age": {"type": "integer"},
+            "created_at": {"type": "object", "properties": {"$date": {"type": "integer"}}},
+            "friend": {
+                "type": "object",
+                "properties": {"$ref": {"type": "string", "pattern": "^\\/api\\/user\\/[^/]+$"}}
+            }
+        }
+    }
+}
+
+NAMES = ['name-{}'.format(i) for i in range(1, 51)]
+
+# The expected results are listed by name rather than derived from matches(), which the indexes and FakePotionServer
+# rely on as well. 'nobody' has no age and 'anonymous' an age of None.
+QUERIES = [
+    ({}, NAMES + ['nobody', 'anonymous']),
+    ({"name": "name-7"}, ['name-7']),
+    ({"name": {"$in": ["name-3", "name-30", "missing"]}}, ['name-3', 'name-30']),
+    ({"age": {"$gt": 10, "$lte": 20}}, NAMES[10:20]),
+    ({"age": {"$between": [5, 8]}, "name": {"$ne": "name-6"}}, ['name-5', 'name-7', 'name-8']),
+    ({"name": {"$startswith": "name-1"}}, ['name-1'] + NAMES[9:19]),
+    ({"name": {"$iendswith": "NAME-9"}}, ['name-9']),
+    ({"name": {"$iendswith": "9"}}, ['name-9', 'name-19', 'name-29', 'name-39', 'name-49']),
+    ({"name": {"$icontains": "E-4"}}, ['name-4'] + NAMES[39:49]),
+    ({"age": {"$lt": 3}}, ['name-1', 'name-2']),
+    ({"age": {"$gte": 49}}, ['name-49', 'name-50']),
+    ({"age": None}, ['nobody', 'anonymous']),
+    ({"age": {"$ne": 5}}, NAMES[:4] + NAMES[5:] + ['nobody', 'anonymous']),
+    ({"age": {"$ne": None}}, NAMES),
+    ({"age": {"$in": [None, 1]}}, ['name-1', 'nobody', 'anonymous']),
+    ({"friend": {"$ref": "/api/user/5"}}, ['name-5']),
+    ({"created_at": {"$gte": {"$date": 1451606400000 + 40 * 3600000}}}, NAMES[39:]),
+]
+
+
+class LocalCollectionTestCase(TestCase):
+    def setUp(self):
+        self.client = FakePotionServer(RESOURCES, rows={'user': 50}).client()
+        self.users = list(self.client.User.instances(per_page=50))
+
+    def test_matches_raw_and_decoded(self):
+        raw = {"name": "foo", "created_at": {"$date": 1451606400000}, "friend": {"$ref": "/api/user/1"}}
+        self.assertTrue(matches(raw, {"created_at": datetime(2016, 1, 1, tzinfo=timezone.utc)}))
+        self.assertTrue(matches(raw, {"friend": self.client.User(1), "name": {"$in": ["foo", "bar"]}}))
+        self.assertFalse(matches(raw, {"friend": {"$ref": "/api/user/2"}}))
+
+        self.assertTrue(matches(self.users[0], {"friend": {"$ref": "/api/user/1"}}))
+        self.assertTrue(matches(self.users[0], {"created_at": {"$lt": {"$date": 1451606400000 + 3600001}}}))
+
+        with self.assertRaises(ValueError):
+            matches(raw, {"name": {"$like": "foo"}})
+
+    def test_indexes_give_same_results(self):
+        items = self.users + [{"$uri": "/api/user/51", "name": "nobody"},
+                               {"$uri": "/api/user/52", "name": "anonymous", "age": None}]
+        scan = LocalCollection(items)
+        indexed = LocalCollection(items, indexes={'name': 'hash', 'age': 'sorted', 'created_at': 'sorted'})
+        indexed.create_index('name', 'sorted')
+        indexed.create_index('friend')
+
+        for where, expected in QUERIES:
+            self.assertEqual(expected, [item.get('name') for item in items if matches(item, where)], where)
+            self.assertEqual(expected, [item.get('name') for item in scan.instances(where=where)], where)
+            self.assertEqual(expected, [item.get('name') for item in indexed.instances(where=where)], where)
+
+    def test_index_selects_candidates(self):
+        users = LocalCollection(self.users, indexes={'name': 'hash', 'age': 'sorted'})
+
+        self.assertEqual(1, len(users._candidates([('name', '$eq', 'name-7')])))
+        self.assertEqual(3, len(users._candidates([('age', '$between', [10, 12]), ('name', '$ne', 'x')])))
+        self.assertEqual(50, len(users._candidates([('name', '$contains', 'x')])))
+
+        users.add({"$uri": "/api/user/51", "name": "name-7"})
+        self.assertEqual(2, len(users.instances(where={"name": "name-7"})))
+
+    def test_sort(self):
+        users = LocalCollection(self.users)
+        self.assertEqual([50, 49, 48], [user.age for user in users.instances(sort={"age": True})[:3]])
+
+        items = [{"a": 1, "b": 2}, {"a": None, "b": 1}, {"a": 1, "b": 1}, {"b": 3}]
+        self.assertEqual([{"b": 3}, {"a": None, "b": 1}, {"a": 1, "b": 2}, {"a": 1, "b": 1}],
+                         sort_items(items, {"a": False, "b": True}))
+        self.assertEqual([{"a": 1, "b": 1}, {"a": 1, "b": 2}, {"a": None, "b": 1}, {"b": 3}],
+                         sort_items(items, {"a": True, "b": False}))
+
+        users.add({"$uri": "/api/user/51", "name": "nobody"})
+        ages = [user.get('age') for user in users.instances(sort={"age": True})]
+        self.assertEqual([50, 49, 48], ages[:3])
+        self.assertEqual([2, 1, None], ages[-3:])
+
+    def test_first_and_one(self):
+        users = LocalCollection(self.users, indexes={'name': 'hash'})
+        self.assertEqual(self.users[6], users.one(where={"name": "name-7"}))
+        self.assertEqual(self.users[49], users.first(where={"age": {"$gt": 10}}, sort={"age": True}))
+
+        with self.assertRaises(ItemNotFound):
+            users.first(where={"name": "missing"})
+        with self.assertRaises(MultipleItemsFound):
+            users.one(where={"age": {"$gt": 10}})
@@ -0,0 +1,60 @@
+import copy
+from unittest import TestCase
+
+from potion_client.converter import schema_resolve_refs
+
+
+class SchemaResolveRefsTestCase(TestCase):
+    def test_self_reference(self):
+        schema = {
+            "type": "object",
+            "properties": {"name": {"type": "string"}},
+            "links": [{"rel": "create", "schema": {"$ref": "#"}}]
+        }
+        original = copy.deepcopy(schema)
+
+        resolved = schema_resolve_refs(schema)
+        self.assertIs(resolved, resolved["links"][0]["schema"])
+        self.assertIs(schema["properties"], resolved["properties"])
+        self.assertEqual(original, schema)
+
+    def test_json_pointer(self):
+        resolved = schema_resolve_refs({
+            "definitions": {
+                "name": {"type": "string"},
+                "alias": {"$ref": "#/definitions/name"},
+                "a/b": {"type": "integer"},
+                "loop": {"$ref": "#/definitions/loop"}
+            },
+            "properties": {
+                "name": {"$ref": "#/definitions/alias"},
+                "tags": {"type": "array", "items": [{"$ref": "#/properties/name"}]},
+                "escaped": {"$ref": "#/definitions/a~1b"},
+                "first": {"$ref": "#/properties/tags/items/0"},
+                "missing": {"$ref": "#/definitions/missing"}
+            }
+        })
+
+        self.assertEqual({"type": "string"}, resolved["properties"]["name"])
+        self.assertIs(resolved["definitions"]["name"], resolved["properties"]["name"])
+        self.assertIs(resolved["definitions"]["name"], resolved["properties"]["tags"]["items"][0])
+        self.assertIs(resolved["definitions"]["name"], resolved["properties"]["first"])
+        self.assertEqual({"type": "integer"}, resolved["properties"]["escaped"])
+        self.assertEqual({"$ref": "#/definitions/missing"}, resolved["properties"]["missing"])
+        self.assertEqual({"$ref": "#/definitions/loop"}, resolved["definitions"]["loop"])
+
+    def test_external_references(self):
+        resolved = schema_resolve_refs({"properties": {"user": {"$ref": "/user/schema#"}}},
+                                       lambda reference: ('resolved', reference))
+        self.assertEqual(('resolved', '/user/schema#'), resolved["properties"]["user"])
+
+    def test_interning(self):
+        interned = {}
+        first = schema_resolve_refs({"properties": {"id": {"type": "integer"}, "flag": {"default": True}},
+                                     "links": [{"schema": {"$ref": "#"}}]}, interned=interned)
+        second = schema_resolve_refs({"properties": {"id": {"type": "integer"}, "flag": {"default": 1}},
+                                      "links": []}, interned=interned)
+
+        self.assertIs(first["properties"]["id"], second["properties"]["id"])
+        self.assertIsNot(first["properties"]["flag"], second["properties"]["flag"])
+        self.assertIs(first, first["links"][0]["schema"])
@@ -0,0 +1,123 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import TestCase
+
+from six.moves.urllib.parse import urlparse, parse_qs
+import responses
+
+from potion_client import Client
+from potion_client.converter import timezone
+from potion_client.snapshot import Snapshot, write_snapshot
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'users.snapshot')
+
+        self.client = client = Client('http://example.com', fetch_schema=False)
+        self.User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "method": "GET",
+                    "href": "/user/{id}"
+                },
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @responses.activate
+    def test_snapshot_paginated_list(self):
+        def request_callback(request):
+            users = [
+                {
+                    "$uri": "/user/{}".format(i),
+                    "name": u"user-{} ☃".format(i),
+                    "created_at": {"$date": 1451060269000},
+                    "parent": {"$ref": "/user/1"}
+                } for i in range(1, 26)
+                ]
+
+            params = parse_qs(urlparse(request.url).query)
+            offset = (int(params['page'][0]) - 1) * int(params['per_page'][0])
+            return 200, {'X-Total-Count': '25'}, json.dumps(users[offset:offset + int(params['per_page'][0])])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        self.assertEqual(25, write_snapshot(self.path, self.User.instances(per_page=10)))
+        calls = len(responses.calls)
+        self.assertEqual(3, calls)
+
+        with Snapshot(self.path, self.client) as snapshot:
+            self.assertEqual(25, len(snapshot))
+            self.assertIs(self.User(3), snapshot[2])
+            self.assertEqual(u"user-3 ☃", snapshot[2].name)
+            self.assertEqual(datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc), snapshot[2]['created_at'])
+            self.assertIs(self.User(1), snapshot[-1]['parent'])
+            self.assertEqual(u"user-25 ☃", snapshot.get('/user/25').name)
+            self.assertIsNone(snapshot.get('/user/26'))
+            self.assertEqual({"$date": 1451060269000}, snapshot.raw(0)['created_at'])
+            self.assertEqual(3, len(snapshot[:3]))
+
+        self.assertEqual(calls, len(responses.calls))
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual({"$ref": "/user/1"}, snapshot[0]['parent'])
+
+    def test_snapshot_resources(self):
+        users = [self.User('/user/1', name='foo'), {"$uri": "/user/2", "name": "bar", "friend": {"$ref": "/user/1"}}]
+        write_snapshot(self.path, users, self.client)
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual([{"$uri": "/user/1", "name": "foo"},
+                              {"$uri": "/user/2", "name": "bar", "friend": {"$ref": "/user/1"}}], list(snapshot))
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'x' * 64)
+
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+    def test_truncated_snapshot(self):
+        write_snapshot(self.path, [{"$uri": "/user/1", "name": "foo"}])
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        for size in (0, 4, len(data) - 1, len(data) - 40):
+            with open(self.path, 'wb') as f:
+                f.write(data[:size])
+
+            with self.assertRaises(ValueError) as context:
+                Snapshot(self.path)
+            self.assertIn('is not a snapshot file', str(context.exception))
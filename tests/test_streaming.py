@@ -0,0 +1,146 @@
+import json
+from datetime import datetime
+from unittest import TestCase
+
+from six.moves.urllib.parse import urlparse, parse_qs
+import responses
+
+from potion_client import Client
+from potion_client.converter import timezone
+from potion_client.hedging import HedgingPolicy
+from potion_client.streaming import iter_json_array
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJSONArrayTestCase(TestCase):
+    def test_split_elements(self):
+        items = [
+            {"name": "foo [bar] {baz}, \"qux\"", "tags": ["a", "b,c"], "nested": {"a": [1, {"b": None}]}},
+            1.5,
+            "\\",
+            [],
+            {},
+            True,
+            None
+        ]
+        data = json.dumps(items, indent=2).encode('utf-8')
+
+        for size in (1, 2, 3, 7, len(data)):
+            elements = list(iter_json_array(chunked(data, size)))
+            self.assertEqual(items, [json.loads(element.decode('utf-8')) for element in elements])
+
+    def test_empty_array(self):
+        self.assertEqual([], list(iter_json_array([b' [ ', b' ] '])))
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'{"items": []}']))
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array([b'[1, 2']))
+
+
+class StreamTestCase(TestCase):
+    @responses.activate
+    def test_stream_pages(self):
+        client = Client('http://example.com', fetch_schema=False)
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {
+                    "type": "string"
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        def request_callback(request):
+            users = [
+                {
+                    "$uri": "/user/{}".format(i),
+                    "name": "user-{}".format(i),
+                    "created_at": {"$date": 1451060269000}
+                } for i in range(1, 26)
+                ]
+
+            params = parse_qs(urlparse(request.url).query)
+            offset = (int(params['page'][0]) - 1) * int(params['per_page'][0])
+            return 200, {'X-Total-Count': '25'}, json.dumps(users[offset:offset + int(params['per_page'][0])])
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=request_callback,
+                               content_type='application/json')
+
+        items = User.instances.stream(per_page=10, chunk_size=16)
+        first = next(items)
+        self.assertEqual(1, len(responses.calls))
+        self.assertIs(User('/user/1'), first)
+        self.assertEqual(datetime(2015, 12, 25, 16, 17, 49, tzinfo=timezone.utc), first['created_at'])
+
+        rest = list(items)
+        self.assertEqual([User('/user/{}'.format(i)) for i in range(2, 26)], rest)
+        self.assertEqual("user-25", rest[-1].name)
+        self.assertEqual(3, len(responses.calls))
+
+    @responses.activate
+    def test_stream_with_hedging(self):
+        client = Client('http://example.com', fetch_schema=False, hedging=HedgingPolicy(initial_delay=0))
+
+        User = client.resource_factory('user', {
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                }
+            },
+            "links": [
+                {
+                    "rel": "instances",
+                    "method": "GET",
+                    "href": "/user",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+        User._links['instances'].hedging = HedgingPolicy(initial_delay=0, max_fraction=1)
+
+        responses.add(responses.GET, 'http://example.com/user',
+                      json=[{"$uri": "/user/{}".format(i), "name": "user-{}".format(i)} for i in range(1, 4)],
+                      headers={'X-Total-Count': '3'})
+
+        self.assertEqual(['/user/1', '/user/2', '/user/3'],
+                         [user._uri for user in User.instances.stream(per_page=10)])
+        self.assertEqual(1, len(responses.calls))
+        self.assertEqual(0, User._links['instances'].hedging.requests)
+
+        # without streaming, the request is hedged
+        self.assertEqual(3, len(User.instances(per_page=10)))
+        self.assertEqual(1, User._links['instances'].hedging.requests)
@@ -0,0 +1,135 @@
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from six.moves.urllib.parse import urlparse, parse_qs
+import responses
+
+from potion_client import Client, Resource
+
+
+class ThreadedClientTestCase(TestCase):
+    @responses.activate
+    def test_shared_client_stress(self):
+        responses.add(responses.GET, 'http://example.com/schema', json={
+            "properties": {
+                "user": {"$ref": "/user/schema#"}
+            }
+        })
+
+        responses.add(responses.GET, 'http://example.com/user/schema', json={
+            "type": "object",
+            "properties": {
+                "$uri": {
+                    "type": "string",
+                    "readOnly": True
+                },
+                "name": {"type": "string"},
+                "friend": {
+                    "type": "object",
+                    "properties": {
+                        "$ref": {"type": "string"}
+                    }
+                }
+            },
+            "links": [
+                {
+                    "rel": "self",
+                    "href": "/user/{id}",
+                    "method": "GET"
+                },
+                {
+                    "rel": "instances",
+                    "href": "/user",
+                    "method": "GET",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "page": {"type": "integer"},
+                            "per_page": {"type": "integer"}
+                        }
+                    }
+                }
+            ]
+        })
+
+        requested = Counter()
+
+        def user_data(i):
+            return {
+                "$uri": "/user/{}".format(i),
+                "name": "user-{}".format(i),
+                "friend": {"$ref": "/user/{}".format((i + 1) % 50)}
+            }
+
+        def instance_callback(request):
+            requested[request.path_url] += 1
+            return 200, {}, json.dumps(user_data(int(request.path_url.rsplit('/', 1)[1])))
+
+        def instances_callback(request):
+            requested[request.path_url] += 1
+            params = parse_qs(urlparse(request.url).query)
+            per_page = int(params['per_page'][0])
+            offset = (int(params['page'][0]) - 1) * per_page
+            users = [user_data(i) for i in range(offset, min(50, offset + per_page))]
+            return 200, {'X-Total-Count': '50'}, json.dumps(users)
+
+        for i in range(50):
+            responses.add_callback(responses.GET, 'http://example.com/user/{}'.format(i),
+                                   callback=instance_callback,
+                                   content_type='application/json')
+
+        responses.add_callback(responses.GET, 'http://example.com/user',
+                               callback=instances_callback,
+                               content_type='application/json')
+
+        client = Client('http://example.com')
+
+        def lookup(i):
+            user = client.User(i % 50)
+            return user, user.name, user.friend.name
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lookup, range(1000)))
+
+        for i, (user, name, friend_name) in enumerate(results):
+            self.assertIs(client.User(i % 50), user)
+            self.assertEqual("user-{}".format(i % 50), name)
+            self.assertEqual("user-{}".format((i + 1) % 50), friend_name)
+
+        self.assertEqual(50, len(requested))
+        self.assertEqual({1}, set(requested.values()))
+
+        requested.clear()
+        users = client.User.instances(per_page=5)
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda i: users[i % 50], range(1000)))
+
+        self.assertEqual([client.User(i % 50) for i in range(1000)], results)
+        self.assertEqual(10, len(requested))
+        self.assertEqual({1}, set(requested.values()))
+
+    def test_resolved_only_when_complete(self):
+        client = Client('http://example.com', fetch_schema=False)
+        observed = []
+
+        class User(Resource):
+            def __setattr__(self, name, value):
+                # what a thread reading without the lock would see once the instance is marked as resolved
+                if name == '_status' and value == 200:
+                    observed.append(dict(self._Reference__properties))
+                super(User, self).__setattr__(name, value)
+
+        client.resource_factory('user', {
+            "type": "object",
+            "properties": {"name": {"type": "string"}},
+            "links": [{"rel": "self", "href": "/user/{id}", "method": "GET"}]
+        }, resource_cls=User)
+
+        for lazy in (False, True):
+            user = client.instance('/user/{}'.format(int(lazy) + 1))
+            del observed[:]
+            client._decode(json.dumps({"$uri": user._uri, "name": "foo"}), lazy=lazy)
+            self.assertEqual([{"$uri": user._uri, "name": "foo"}], observed)
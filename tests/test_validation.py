@@ -0,0 +1,106 @@
+from datetime import datetime
+from unittest import TestCase
+
+from jsonschema import ValidationError
+
+from potion_client.converter import timezone
+from potion_client.testing import FakePotionServer
+from potion_client.validation import validator_schema
+
+RESOURCES = {
+    "user": {
+        "type": "object",
+        "properties": {
+            "$uri": {"type": "string", "readOnly": True},
+            "name": {"type": "string", "minLength": 1},
+            "age": {"type": "integer", "minimum": 0},
+            "created_at": {"type": "object", "properties": {"$date": {"type": "integer"}}},
+            "friend": {
+                "type": ["object", "null"],
+                "properties": {"$ref": {"type": "string", "pattern": "^\\/api\\/user\\/[^/]+$"}}
+            }
+        },
+        "required": ["name"]
+    }
+}
+
+
+class ValidationTestCase(TestCase):
+    def setUp(self):
+        self.server = FakePotionServer(RESOURCES, rows={'user': 2})
+
+    def test_validate_before_sending(self):
+        client = self.server.client(validation=True)
+        requests = len(self.server.requests)
+
+        with self.assertRaises(ValidationError) as context:
+            client.User(name='Alice', age=-1).save()
+        self.assertEqual(['age'], list(context.exception.path))
+
+        with self.assertRaises(ValidationError):
+            client.User(age=1).save()
+        self.assertEqual(requests, len(self.server.requests))
+
+        user = client.User(name='Alice',
+                           age=30,
+                           created_at=datetime(2016, 1, 1, tzinfo=timezone.utc),
+                           friend=client.User(1))
+        user.save()
+        self.assertEqual(3, user.id)
+
+        user.age = 'thirty'
+        with self.assertRaises(ValidationError):
+            user.save()
+
+    def test_validation_is_optional(self):
+        client = self.server.client()
+        client.User(age=-1).save()
+
+        client.User._links['create'].validation = True
+        with self.assertRaises(ValidationError):
+            client.User(age=-1).save()
+
+        client.validation = True
+        client.User._links['create'].validation = False
+        client.User(age=-1).save()
+
+    def test_partial_update(self):
+        client = self.server.client(validation=True)
+
+        user = client.User(1)
+        user._update(age=41)
+        self.assertEqual(41, self.server.data['user'][1]['age'])
+
+        with self.assertRaises(ValidationError):
+            user._update(age=-1)
+        with self.assertRaises(ValidationError):
+            client.User._create.validate({"age": 41})
+
+    def test_validator_is_cached(self):
+        client = self.server.client()
+        self.assertIs(client.User._create.validator, client.User._create.validator)
+        self.assertIs(client.User._create.validator, client.User()._validator)
+
+    def test_validate_many(self):
+        client = self.server.client()
+        errors = client.User._create.validate_many([
+            {"name": "Alice"},
+            {"name": ""},
+            {"name": "Bob", "friend": client.User(2)},
+            {"name": "Carol", "friend": {"$ref": "/api/group/1"}},
+        ])
+
+        self.assertEqual([False, True, False, True], [error is not None for error in errors])
+        self.assertIsInstance(errors[1], ValidationError)
+
+    def test_validator_schema(self):
+        schema = {"type": "object", "properties": {}}
+        schema["properties"]["parent"] = schema
+
+        self.assertEqual({"type": "object", "properties": {"parent": {"$ref": "#"}}}, validator_schema(schema))
+
+        schema["required"] = ["parent"]
+        schema["properties"]["child"] = {"type": "object", "required": ["name"]}
+        self.assertEqual({"type": "object",
+                          "properties": {"parent": {"$ref": "#"}, "child": {"type": "object", "required": ["name"]}}},
+                         validator_schema(schema, partial=True))